@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Render the final movie in a single ffmpeg pass.
+
+The scene clips are concatenated, the music track is mixed in and the
+narration subtitles are either added as a soft subtitle track or burned into
+the picture, all in one ffmpeg run. The video is decoded and encoded at most
+once: with soft (or no) subtitles and clips that share their codec
+parameters it is not re-encoded at all.
+
+By default the inputs come from the movie directory: clips/*.mp4 (in name
+order), narration.srt and music.* (mp3, wav, m4a, aac, ogg or flac).
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+CLIP_EXTENSIONS = ('.mp4', '.mov', '.mkv', '.webm')
+MUSIC_EXTENSIONS = ('.mp3', '.wav', '.m4a', '.aac', '.ogg', '.flac')
+CLIPS_DIRNAME = 'clips'
+SRT_FILENAME = 'narration.srt'
+DEFAULT_OUTPUT = 'final.mp4'
+
+
+def find_clips(movie_dir):
+    clips_dir = os.path.join(movie_dir, CLIPS_DIRNAME)
+    if not os.path.isdir(clips_dir):
+        return []
+    return sorted(os.path.join(clips_dir, name) for name in os.listdir(clips_dir)
+                  if name.lower().endswith(CLIP_EXTENSIONS))
+
+
+def find_music(movie_dir):
+    for extension in MUSIC_EXTENSIONS:
+        path = os.path.join(movie_dir, f"music{extension}")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def probe_clip(path):
+    """Return a clip's size, fps, duration and whether it has an audio stream, from one ffmpeg -i call."""
+    from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+    infos = ffmpeg_parse_infos(path)
+    return {
+        'size': infos['video_size'],
+        'fps': infos['video_fps'],
+        'duration': infos['duration'],
+        'has_audio': bool(infos.get('audio_found')),
+    }
+
+
+def build_command(ffmpeg, clips, infos, output, work_dir, srt=None, music=None, subtitles='soft', clip_audio='keep',
+                  music_volume=0.5, faststart=True, crf=20, preset='medium', font_size=24, compatible=True):
+    """Build the ffmpeg command for one assembly pass.
+
+    infos holds probe_clip() of each clip. compatible clips (same codec parameters)
+    are read through the concat demuxer, otherwise each clip is decoded and scaled
+    to the first clip's size and frame rate by the concat filter, with silence for
+    clips without audio. With music, clip_audio 'keep' writes the clips' audio and
+    the music as two audio tracks. Files the command needs are written to work_dir,
+    which must also be ffmpeg's working directory.
+
+    Returns:
+        Tuple (command, copies_video)
+    """
+    from join_videos import write_concat_list
+
+    burn = srt is not None and subtitles == 'burn'
+    inputs = []
+    filters = []
+
+    if compatible:
+        list_path = os.path.join(work_dir, 'clips.txt')
+        with open(list_path, 'w', encoding="utf-8") as f:
+            write_concat_list(clips, f)
+        inputs += ['-f', 'concat', '-safe', '0', '-i', list_path]
+        video = '0:v'
+        audio = '0:a?' if clip_audio != 'drop' else None
+        next_input = 1
+    else:
+        width, height = infos[0]['size']
+        fps = infos[0]['fps']
+        concat_inputs = ''
+        for i, (clip, info) in enumerate(zip(clips, infos)):
+            inputs += ['-i', os.path.abspath(clip)]
+            filters.append(
+                f"[{i}:v]scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1,fps={fps},format=yuv420p[v{i}]"
+            )
+            if clip_audio == 'drop':
+                concat_inputs += f"[v{i}]"
+            elif info['has_audio']:
+                concat_inputs += f"[v{i}][{i}:a]"
+            else:
+                # The concat filter needs audio in every segment: fill silent clips with silence
+                filters.append(f"anullsrc=channel_layout=stereo:sample_rate=44100,"
+                               f"atrim=duration={info['duration']:.3f}[s{i}]")
+                concat_inputs += f"[v{i}][s{i}]"
+        if clip_audio != 'drop':
+            filters.append(f"{concat_inputs}concat=n={len(clips)}:v=1:a=1[vcat][acat]")
+            audio = '[acat]'
+        else:
+            filters.append(f"{concat_inputs}concat=n={len(clips)}:v=1:a=0[vcat]")
+            audio = None
+        video = '[vcat]'
+        next_input = len(clips)
+
+    if burn:
+        # The subtitles filter has its own escaping rules for paths; a plain relative name avoids them
+        shutil.copyfile(srt, os.path.join(work_dir, 'subtitles.srt'))
+        source = video if video.startswith('[') else f"[{video}]"
+        filters.append(f"{source}subtitles=subtitles.srt:force_style='FontSize={font_size}'[vout]")
+        video = '[vout]'
+
+    if music:
+        # Loop the music so it covers the whole movie and cut it at the end of the clips.
+        # -shortest can't do this: it would also end the movie with the last subtitle.
+        inputs += ['-stream_loop', '-1', '-i', os.path.abspath(music)]
+        duration = sum(info['duration'] for info in infos)
+        filters.append(f"[{next_input}:a]volume={music_volume},atrim=duration={duration:.3f}[music]")
+        if clip_audio == 'mix' and audio:
+            source = audio if audio.startswith('[') else f"[{audio.rstrip('?')}]"
+            filters.append(f"{source}[music]amix=inputs=2:duration=first:dropout_transition=0[aout]")
+            audios = ['[aout]']
+        elif audio:
+            # Keep the clips' audio as the first track and add the music as a second one
+            audios = [audio, '[music]']
+        else:
+            audios = ['[music]']
+        next_input += 1
+    else:
+        audios = [audio] if audio else []
+
+    soft_subtitles = srt is not None and subtitles == 'soft'
+    if soft_subtitles:
+        inputs += ['-i', os.path.abspath(srt)]
+
+    copies_video = compatible and not burn
+    command = [ffmpeg, '-y', '-v', 'error', '-nostats', '-progress', 'pipe:1'] + inputs
+    if filters:
+        command += ['-filter_complex', ';'.join(filters)]
+    command += ['-map', video]
+    for audio in audios:
+        command += ['-map', audio]
+    if soft_subtitles:
+        command += ['-map', f"{next_input}:s", '-c:s', 'mov_text', '-metadata:s:s:0', 'language=eng']
+    if copies_video:
+        command += ['-c:v', 'copy']
+    else:
+        command += ['-c:v', 'libx264', '-preset', preset, '-crf', str(crf), '-pix_fmt', 'yuv420p']
+    for i, audio in enumerate(audios):
+        # Audio straight from the clips is copied; filtered audio has to be encoded
+        command += [f'-c:a:{i}', 'copy'] if audio == '0:a?' else [f'-c:a:{i}', 'aac', f'-b:a:{i}', '192k']
+    if faststart:
+        command += ['-movflags', '+faststart']
+    command.append(os.path.abspath(output))
+    return command, copies_video
+
+
+def run_ffmpeg(command, cwd):
+    """Run ffmpeg, reading its -progress output. Returns the last progress values."""
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, cwd=cwd)
+    progress = {}
+    for line in process.stdout:
+        key, _, value = line.strip().partition('=')
+        progress[key] = value
+    errors = process.stderr.read()
+    if process.wait() != 0:
+        raise RuntimeError(f"ffmpeg failed: {errors.strip()[-500:]}")
+    return progress
+
+
+def assemble(clips, output, srt=None, music=None, subtitles='soft', clip_audio=None, music_volume=0.5,
+             faststart=True, crf=20, preset='medium', font_size=24):
+    """
+    Concatenate clips, add music and subtitles, and write output in one ffmpeg pass.
+    subtitles is 'soft' (mov_text track), 'burn' (rendered into the picture) or 'none'.
+    clip_audio is 'keep', 'drop' or 'mix' (with the music); by default clip audio is
+    kept without music and replaced by the music otherwise. With music, 'keep' writes
+    the clip audio and the music as separate tracks. Clips without audio are treated
+    as silent.
+    Returns dict with the output path, seconds, frames and fps (0 when the video is
+    copied), media_seconds, speed (times real time) and whether the video was copied
+    or encoded.
+    """
+    if not clips:
+        raise ValueError("No clips to assemble")
+
+    from join_videos import find_ffmpeg, can_stream_copy
+
+    ffmpeg = find_ffmpeg()
+    if not ffmpeg:
+        raise RuntimeError("ffmpeg not found")
+    if subtitles == 'none':
+        srt = None
+    clip_audio = clip_audio or ('drop' if music else 'keep')
+    infos = [probe_clip(clip) for clip in clips]
+    if not any(info['has_audio'] for info in infos):
+        # Generated scene clips are usually silent
+        clip_audio = 'drop'
+    compatible = len(clips) == 1 or can_stream_copy(clips)[0]
+
+    output_dir = os.path.dirname(output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory() as work_dir:
+        command, copies_video = build_command(
+            ffmpeg, clips, infos, output, work_dir, srt=srt, music=music, subtitles=subtitles, clip_audio=clip_audio,
+            music_volume=music_volume, faststart=faststart, crf=crf, preset=preset, font_size=font_size,
+            compatible=compatible,
+        )
+        started = time.monotonic()
+        progress = run_ffmpeg(command, work_dir)
+        seconds = time.monotonic() - started
+
+    # ffmpeg reports no frame count when the video is copied
+    frames = int(progress.get('frame', 0) or 0)
+    media_seconds = int(progress.get('out_time_us', 0) or 0) / 1e6
+    return {
+        'output': output,
+        'seconds': round(seconds, 2),
+        'frames': frames,
+        'fps': round(frames / seconds, 1) if seconds > 0 else 0.0,
+        'media_seconds': round(media_seconds, 2),
+        'speed': round(media_seconds / seconds, 1) if seconds > 0 else 0.0,
+        'video': 'copy' if copies_video else 'encode',
+        'subtitles': subtitles if srt else 'none',
+        'music': music,
+    }
+
+
+def assemble_movie(movie_dir, clips=None, music=None, output=None, **options):
+    """Assemble a movie directory's clips, narration.srt and music into its final MP4."""
+    clips = clips or find_clips(movie_dir)
+    srt = os.path.join(movie_dir, SRT_FILENAME)
+    result = assemble(
+        clips,
+        output or os.path.join(movie_dir, DEFAULT_OUTPUT),
+        srt=srt if os.path.exists(srt) else None,
+        music=music or find_music(movie_dir),
+        **options
+    )
+    if result['video'] == 'encode':
+        rate = f"{result['frames']} frames encoded at {result['fps']} fps"
+    else:
+        rate = "video copied"
+    print(f"Assembled {result['output']} ({result['media_seconds']}s of video) in {result['seconds']}s: "
+          f"{rate}, {result['speed']}x real time, subtitles {result['subtitles']}")
+    return result
+
+
+def add_assemble_arguments(parser):
+    """Add the final render options shared by this script and filmcrew.py."""
+    parser.add_argument('--music', help="Music track (default: music.* in the movie directory)")
+    parser.add_argument('--subtitles', choices=('soft', 'burn', 'none'), default='soft',
+                        help="Add narration.srt as a subtitle track (default), burn it into the picture, "
+                             "or leave it out")
+    parser.add_argument('--clip-audio', choices=('keep', 'drop', 'mix'),
+                        help="The clips' own audio: keep it (as a separate track from the music), drop it, "
+                             "or mix it with the music (default: drop with music, keep without)")
+    parser.add_argument('--music-volume', type=float, default=0.5, help="Music volume factor (default: 0.5)")
+    parser.add_argument('--no-faststart', action='store_true',
+                        help="Don't move the MP4 index to the front of the file")
+    parser.add_argument('--crf', type=int, default=20, help="x264 quality when encoding, lower is better (default: 20)")
+    parser.add_argument('--preset', default='medium', help="x264 speed preset when encoding (default: medium)")
+    parser.add_argument('--font-size', type=int, default=24, help="Font size of burned subtitles (default: 24)")
+
+
+def check_assemble_arguments(parser):
+    """Reject the render (via parser.error) if ffmpeg is missing, rather than after the crew has run."""
+    from join_videos import find_ffmpeg
+    if find_ffmpeg() is None:
+        parser.error("ffmpeg not found, it is needed to render the movie")
+
+
+def assemble_options(args):
+    return {
+        'subtitles': args.subtitles,
+        'clip_audio': args.clip_audio,
+        'music_volume': args.music_volume,
+        'faststart': not args.no_faststart,
+        'crf': args.crf,
+        'preset': args.preset,
+        'font_size': args.font_size,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Render a movie directory's clips, music and subtitles "
+                                                 "into the final MP4 in one pass")
+    parser.add_argument('movie_dir', help="Movie directory with narration.srt (and clips/, music.*)")
+    parser.add_argument('--clips', nargs='+', help="Scene clips in order (default: clips/ in the movie directory)")
+    parser.add_argument('-o', '--output', help="Output file (default: final.mp4 in the movie directory)")
+    add_assemble_arguments(parser)
+    args = parser.parse_args()
+    check_assemble_arguments(parser)
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        assemble_movie(args.movie_dir, clips=args.clips, music=args.music, output=args.output,
+                       **assemble_options(args))
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"Error while assembling the movie: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Generate many movies from a JSONL file of briefs through a shared worker pool.
+
+Each line of the input file is a JSON object with a "brief" and an optional "id"
+(letters, digits, "_" and "-"; it becomes part of the movie directory name):
+
+    {"id": "heist", "brief": "A cat plans a heist on the fish market"}
+"""
+
+import sys
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from filmcrew import MovieScriptGenerator, add_generator_arguments, build_cache, build_catalog, positive_int
+
+
+class RateLimiter:
+    """Token-bucket limiter for requests per minute and tokens per minute, shared across threads."""
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute or 0)
+        self._tokens = float(tokens_per_minute or 0)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._updated = now
+        if self.requests_per_minute:
+            self._requests = min(self.requests_per_minute,
+                                 self._requests + elapsed * self.requests_per_minute / 60)
+        if self.tokens_per_minute:
+            self._tokens = min(self.tokens_per_minute,
+                               self._tokens + elapsed * self.tokens_per_minute / 60)
+
+    def acquire(self, tokens=0):
+        """Block until one request and `tokens` tokens fit within the per-minute budgets."""
+        if self.tokens_per_minute:
+            # A single request larger than the whole budget may use the full bucket
+            tokens = min(tokens, self.tokens_per_minute)
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                wait_seconds = 0.0
+                if self.requests_per_minute and self._requests < 1:
+                    wait_seconds = (1 - self._requests) * 60 / self.requests_per_minute
+                if self.tokens_per_minute and self._tokens < tokens:
+                    wait_seconds = max(wait_seconds,
+                                       (tokens - self._tokens) * 60 / self.tokens_per_minute)
+                if wait_seconds == 0:
+                    if self.requests_per_minute:
+                        self._requests -= 1
+                    if self.tokens_per_minute:
+                        self._tokens -= tokens
+                    return
+            time.sleep(wait_seconds)
+
+
+def read_jobs(path):
+    """Yield (job_id, brief, error) triples from a JSONL file, one line at a time.
+
+    A line that isn't a JSON object with a "brief", or repeats an earlier id, is
+    yielded with brief None and the reason in error, so it's reported as a failed
+    job instead of ending the batch.
+    """
+    seen_ids = set()
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                job = json.loads(line)
+            except ValueError as e:
+                yield str(line_number), None, f"Line {line_number} is not valid JSON: {str(e)}"
+                continue
+            if not isinstance(job, dict) or not job.get('brief'):
+                yield str(line_number), None, f"Line {line_number} has no \"brief\""
+                continue
+            job_id = str(job.get('id', line_number))
+            if job_id in seen_ids:
+                # Jobs with the same id would share a movie directory
+                yield str(line_number), None, f"Line {line_number} repeats the id \"{job_id}\""
+                continue
+            seen_ids.add(job_id)
+            yield job_id, job['brief'], None
+
+
+class BatchRunner:
+    def __init__(self, workers=2, max_pending=None, generator_options=None):
+        self.workers = workers
+        # Backpressure: never read more than this many jobs ahead of the workers
+        self.max_pending = max_pending or workers * 2
+        self.generator_options = generator_options or {}
+        self._local = threading.local()
+
+    def get_generator(self):
+        """Return this worker thread's generator; its agents are built once and reused across jobs."""
+        generator = getattr(self._local, 'generator', None)
+        if generator is None:
+            generator = MovieScriptGenerator(**self.generator_options)
+            self._local.generator = generator
+        return generator
+
+    def run_job(self, job_id, brief):
+        started = time.monotonic()
+        try:
+            generator = self.get_generator()
+            generator.run(brief=brief, movie_id=job_id)
+            result = {'id': job_id, 'status': 'done', 'movie_dir': generator.movie_dir}
+        except Exception as e:
+            # One failed movie must not take down the rest of the batch
+            result = {'id': job_id, 'status': 'failed', 'error': str(e)}
+        result['seconds'] = round(time.monotonic() - started, 2)
+        print(f"[{result['status']}] job {job_id} in {result['seconds']}s")
+        return result
+
+    def run(self, jobs):
+        """Run (job_id, brief, error) triples through the worker pool and return one result dict per job.
+
+        Jobs with an error aren't run and are reported as failed.
+        """
+        slots = threading.BoundedSemaphore(self.max_pending)
+        futures = []
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for job_id, brief, error in jobs:
+                if error:
+                    print(f"[failed] job {job_id}: {error}")
+                    future = Future()
+                    future.set_result({'id': job_id, 'status': 'failed', 'error': error, 'seconds': 0.0})
+                    futures.append(future)
+                    continue
+                slots.acquire()
+                future = pool.submit(self.run_job, job_id, brief)
+                future.add_done_callback(lambda _: slots.release())
+                futures.append(future)
+        return [future.result() for future in futures]
+
+
+def print_summary(results, elapsed):
+    done = sum(1 for r in results if r['status'] == 'done')
+    failed = len(results) - done
+    movies_per_hour = done / elapsed * 3600 if elapsed > 0 else 0
+    print("\nBatch complete!")
+    print(f"Total jobs: {len(results)}")
+    print(f"Successfully generated: {done}")
+    print(f"Failed jobs: {failed}")
+    for result in results:
+        if result['status'] == 'failed':
+            print(f"  {result['id']}: {result['error']}")
+    print(f"Elapsed: {elapsed:.1f}s ({movies_per_hour:.1f} movies/hour)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate movies for every brief in a JSONL file")
+    parser.add_argument('briefs', help="JSONL file with one {\"id\", \"brief\"} object per line")
+    parser.add_argument('--workers', type=positive_int, default=2,
+                        help="Number of movies generated at once (default: 2)")
+    parser.add_argument('--max-pending', type=positive_int,
+                        help="Maximum jobs queued ahead of the workers (default: 2 x workers)")
+    parser.add_argument('--rpm', type=int, help="Global limit on model requests per minute")
+    parser.add_argument('--tpm', type=int, help="Global limit on model tokens per minute")
+    add_generator_arguments(parser)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    runner = BatchRunner(
+        workers=args.workers,
+        max_pending=args.max_pending,
+        generator_options={
+            'parallel': args.parallel,
+            'max_concurrency': args.max_concurrency,
+            'scene_duration': args.scene_duration,
+            'max_repairs': args.max_repairs,
+            # Cache and limiter are shared by every worker
+            'cache': build_cache(args),
+            'rate_limiter': RateLimiter(args.rpm, args.tpm),
+            'catalog': build_catalog(args),
+        },
+    )
+
+    started = time.monotonic()
+    try:
+        results = runner.run(read_jobs(args.briefs))
+    except (OSError, ValueError) as e:
+        print(f"Error reading briefs: {str(e)}")
+        sys.exit(1)
+    print_summary(results, time.monotonic() - started)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark join_videos and webp_to_jpg on synthetic media.
+
+Test clips are rendered with ffmpeg's lavfi test sources and test images are
+generated with numpy, so no media files are needed.
+
+Usage: python benchmarks/bench_media.py [--clips 6] [--clip-seconds 2] [--images 24] [--image-size 1536]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import contextlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+from PIL import Image
+
+
+def make_clips(directory, count, seconds, size='640x360', fps=25):
+    """Render `count` identical-format H.264/AAC test clips and return their paths."""
+    from join_videos import find_ffmpeg
+
+    ffmpeg = find_ffmpeg()
+    if not ffmpeg:
+        raise RuntimeError("ffmpeg not found")
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"clip_{i:03d}.mp4")
+        subprocess.run(
+            [ffmpeg, '-y', '-v', 'error',
+             '-f', 'lavfi', '-i', f"testsrc=size={size}:rate={fps}:duration={seconds}",
+             '-f', 'lavfi', '-i', f"sine=frequency={220 + 20 * i}:duration={seconds}",
+             '-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-c:a', 'aac', '-shortest', path],
+            check=True
+        )
+        paths.append(path)
+    return paths
+
+
+def make_images(directory, count, size):
+    """Write `count` deterministic size x size WebP images and return their paths."""
+    rng = np.random.default_rng(0)
+    gradient = np.linspace(0, 255, size, dtype=np.float32)
+    paths = []
+    for i in range(count):
+        # Smooth gradients plus noise compress roughly like real renders
+        pixels = np.empty((size, size, 3), dtype=np.float32)
+        pixels[..., 0] = gradient[None, :]
+        pixels[..., 1] = gradient[:, None]
+        pixels[..., 2] = (i * 10) % 256
+        pixels += rng.normal(0, 12, pixels.shape)
+        path = os.path.join(directory, f"image_{i:03d}.webp")
+        Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).save(path, 'WEBP', quality=80)
+        paths.append(path)
+    return paths
+
+
+def timed(func, *args, **kwargs):
+    """Return the seconds one call takes, with the function's progress output suppressed."""
+    started = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        func(*args, **kwargs)
+    return time.perf_counter() - started
+
+
+def run_join(clip_count=6, clip_seconds=2):
+    from join_videos import join_videos
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        clips = make_clips(tmp, clip_count, clip_seconds)
+        for mode in ('copy', 'stream', 'reencode'):
+            output = os.path.join(tmp, f"joined_{mode}.mp4")
+            seconds = timed(join_videos, clips, mode=mode, output_name=output)
+            results[f"join_videos_{mode}"] = {
+                'seconds': seconds,
+                'clips': clip_count,
+                'clip_seconds': clip_seconds,
+                'output_bytes': os.path.getsize(output),
+            }
+
+    print(f"join_videos, {clip_count} clips of {clip_seconds}s")
+    for name, result in results.items():
+        print(f"  {name:<22} {result['seconds'] * 1000:9.1f} ms")
+    return results
+
+
+def run_webp(image_count=24, image_size=1536):
+    from webp_to_jpg import process_directory
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        make_images(tmp, image_count, image_size)
+        for name, options in (
+            ('webp_to_jpg_serial', {'workers': 1}),
+            ('webp_to_jpg_parallel', {}),
+            ('webp_to_jpg_max_size', {'max_size': image_size // 2}),
+        ):
+            seconds = timed(process_directory, tmp, force=True, **options)
+            results[name] = {'seconds': seconds, 'images': image_count, 'image_size': image_size,
+                             'workers': options.get('workers') or os.cpu_count()}
+        # Nothing to do on a second pass: measures the up-to-date check
+        results['webp_to_jpg_up_to_date'] = {'seconds': timed(process_directory, tmp), 'images': image_count}
+
+    print(f"webp_to_jpg, {image_count} images of {image_size}x{image_size}")
+    for name, result in results.items():
+        print(f"  {name:<22} {result['seconds'] * 1000:9.1f} ms")
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark join_videos and webp_to_jpg on synthetic media")
+    parser.add_argument('--clips', type=int, default=6, help="Number of test clips (default: 6)")
+    parser.add_argument('--clip-seconds', type=float, default=2, help="Length of each clip (default: 2)")
+    parser.add_argument('--images', type=int, default=24, help="Number of test images (default: 24)")
+    parser.add_argument('--image-size', type=int, default=1536, help="Test image width and height (default: 1536)")
+    parser.add_argument('--json', action='store_true', help="Print the results as JSON")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = {}
+    results.update(run_join(args.clips, args.clip_seconds))
+    results.update(run_webp(args.images, args.image_size))
+    if args.json:
+        print(json.dumps(results, indent=2))
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark MovieScriptGenerator end to end against the offline FakeLLM.
+
+Runs the full pipeline (task graph, validation, saving outputs, SRT assembly)
+sequentially and in parallel, in a temporary working directory, and reports
+seconds per movie. With zero latency this measures the pipeline's own overhead;
+with a latency it shows how much of the model time parallelism hides.
+
+Usage: python benchmarks/bench_pipeline.py [--latency 0.2] [--scenes 5] [--words 20] [--runs 3]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import contextlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+# Never reach a real model or telemetry endpoint from a benchmark
+os.environ.setdefault('OPENAI_API_KEY', 'benchmark')
+os.environ['OTEL_SDK_DISABLED'] = 'true'
+os.environ['CREWAI_DISABLE_TELEMETRY'] = 'true'
+
+from fake_llm import FakeLLM
+from filmcrew import MovieScriptGenerator
+
+
+def time_runs(runs, latency, scenes, words, parallel):
+    """Generate `runs` movies with one generator (agents built once) and return per-run seconds."""
+    llm = FakeLLM(model='fake-llm', latency=latency, scenes=scenes, words=words)
+    generator = MovieScriptGenerator(parallel=parallel, llm=llm, verbose=False)
+    seconds = []
+    for i in range(runs):
+        started = time.perf_counter()
+        # The pipeline prints progress; keep it out of the benchmark output
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            generator.run(brief=f"Benchmark brief {i}", movie_id=f"bench{i}")
+        seconds.append(time.perf_counter() - started)
+    return seconds
+
+
+def run(latency=0.0, scenes=5, words=20, runs=3):
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Movie directories are created under ./files
+        os.chdir(tmp)
+        try:
+            for name, parallel in (('pipeline_sequential', False), ('pipeline_parallel', True)):
+                seconds = time_runs(runs, latency, scenes, words, parallel)
+                results[name] = {
+                    'seconds': min(seconds),
+                    'mean_seconds': sum(seconds) / len(seconds),
+                    'runs': runs,
+                    'latency': latency,
+                    'scenes': scenes,
+                    'words': words,
+                }
+        finally:
+            os.chdir(cwd)
+
+    print(f"Pipeline, {scenes} scenes, {words} words per field, {latency}s model latency")
+    for name, result in results.items():
+        print(f"  {name:<22} {result['seconds'] * 1000:9.1f} ms best, {result['mean_seconds'] * 1000:9.1f} ms mean")
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the crew pipeline against a fake LLM")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds per fake model call (default: 0)")
+    parser.add_argument('--scenes', type=int, default=5, help="Scenes in the fake script (default: 5)")
+    parser.add_argument('--words', type=int, default=20, help="Words per text field (default: 20)")
+    parser.add_argument('--runs', type=int, default=3, help="Movies generated per mode (default: 3)")
+    parser.add_argument('--json', action='store_true', help="Print the results as JSON")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = run(args.latency, args.scenes, args.words, args.runs)
+    if args.json:
+        print(json.dumps(results, indent=2))
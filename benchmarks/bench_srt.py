@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark the streaming SRT validator against the previous structure-only validator,
+and batched timestamp formatting against the per-entry helper.
+
+Usage: python benchmarks/bench_srt.py [entry_count] [--json]
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+
+from srt_utils import create_srt_entry, format_timestamp, format_timestamps, validate_srt, validate_srt_file
+
+
+def legacy_validate_srt(srt_content):
+    """The original validator: checks numbering and ' --> ' only, on the whole string."""
+    lines = srt_content.strip().split('\n')
+    entry_count = 1
+    i = 0
+    while i < len(lines):
+        while i < len(lines) and not lines[i].strip():
+            i += 1
+        if i >= len(lines):
+            break
+        if not lines[i].strip().isdigit() or int(lines[i]) != entry_count:
+            return False, f"Invalid entry index at line {i+1}"
+        i += 1
+        if i >= len(lines):
+            return False, "Unexpected end of file after index"
+        if len(lines[i].split(' --> ')) != 2:
+            return False, f"Invalid timestamp format at line {i+1}"
+        i += 1
+        if i >= len(lines):
+            return False, "Unexpected end of file after timestamp"
+        while i < len(lines) and lines[i].strip():
+            i += 1
+        entry_count += 1
+    return True, "Valid SRT format"
+
+
+def synthetic_srt(entry_count, duration=4.5, gap=0.5):
+    """Yield SRT entries of `duration` seconds separated by `gap` seconds."""
+    for i in range(entry_count):
+        start = i * (duration + gap)
+        yield create_srt_entry(i + 1, format_timestamp(start), format_timestamp(start + duration),
+                               f"Narration line number {i + 1} for the synthetic movie")
+
+
+def measure(func, *args):
+    """Return (seconds, peak traced bytes, result) for one call.
+
+    Time and memory are measured in separate calls, since tracing allocations
+    slows the code down several times.
+    """
+    started = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def run(entry_count):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'synthetic.srt')
+        with open(path, 'w', encoding="utf-8") as f:
+            f.writelines(synthetic_srt(entry_count))
+        with open(path, encoding="utf-8") as f:
+            content = f.read()
+
+        results = {}
+        for name, func, arg in (
+            ('legacy_validate_srt', legacy_validate_srt, (content,)),
+            ('validate_srt', validate_srt, (content, 5)),
+            ('validate_srt_file', validate_srt_file, (path, 5)),
+        ):
+            elapsed, peak, (is_valid, _) = measure(func, *arg)
+            results[name] = {'seconds': elapsed, 'peak_bytes': peak, 'entries': entry_count, 'valid': is_valid}
+
+    print(f"{entry_count} entries ({len(content) / 1e6:.1f} MB)")
+    for name, result in results.items():
+        print(f"  {name:<22} {result['seconds'] * 1000:9.1f} ms  peak {result['peak_bytes'] / 1e6:7.2f} MB  "
+              f"valid={result['valid']}")
+    return results
+
+
+def run_formatting(entry_count):
+    milliseconds = np.arange(entry_count, dtype=np.int64) * 5000
+    results = {}
+    for name, func, arg in (
+        ('format_timestamp_loop', lambda: [format_timestamp(ms / 1000) for ms in milliseconds.tolist()], ()),
+        ('format_timestamps', format_timestamps, (milliseconds,)),
+    ):
+        elapsed, peak, _ = measure(func, *arg)
+        results[name] = {'seconds': elapsed, 'peak_bytes': peak, 'timestamps': entry_count}
+    print(f"{entry_count} timestamps")
+    for name, result in results.items():
+        print(f"  {name:<22} {result['seconds'] * 1000:9.1f} ms  peak {result['peak_bytes'] / 1e6:7.2f} MB")
+    return results
+
+
+if __name__ == "__main__":
+    arguments = [arg for arg in sys.argv[1:] if arg != '--json']
+    count = int(arguments[0]) if arguments else 100000
+    results = {**run(count), **run_formatting(count)}
+    if '--json' in sys.argv[1:]:
+        print(json.dumps(results, indent=2))
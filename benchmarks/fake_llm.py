@@ -0,0 +1,80 @@
+"""
+Deterministic stand-in for the model, so the crew pipeline can be benchmarked offline.
+
+FakeLLM answers every agent with a fixed, well-formed response of a configurable
+size after a configurable delay, without any network access. The same settings
+always produce the same responses.
+"""
+
+import json
+import time
+
+from crewai.llms.base_llm import BaseLLM
+
+WORDS = ("moon cat roof night silver light city quiet owl wind dream chase "
+         "shadow river lantern street old clock rain glass").split()
+CHARACTERS = ('Mira', 'Otto')
+
+
+def words(count, offset=0):
+    """Return `count` words of filler text, starting at `offset` in the word list."""
+    return ' '.join(WORDS[(offset + i) % len(WORDS)] for i in range(count))
+
+
+class FakeLLM(BaseLLM):
+    """A model that returns canned responses sized by `scenes` and `words`.
+
+    latency: seconds every call sleeps, standing in for the model's response time
+    scenes: number of scenes in the script (and prompts/cues derived from it)
+    words: length of each free-text field, in words
+    """
+    latency: float = 0.0
+    scenes: int = 5
+    words: int = 20
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, **kwargs):
+        time.sleep(self.latency)
+        role = from_agent.role if from_agent is not None else self.role_from_messages(messages)
+        return "Thought: I now know the final answer\nFinal Answer: " + self.respond(role)
+
+    def supports_function_calling(self):
+        return False
+
+    @staticmethod
+    def role_from_messages(messages):
+        text = messages if isinstance(messages, str) else json.dumps(messages)
+        for role in ('Story Writer', 'Character Designer', 'Scene Designer', 'Music Designer', 'Narrator'):
+            if f"You are {role}" in text:
+                return role
+        return None
+
+    def scene_character(self, number):
+        return CHARACTERS[number % len(CHARACTERS)]
+
+    def respond(self, role):
+        numbers = range(1, self.scenes + 1)
+        if role == 'Story Writer':
+            body = {
+                'title': 'Benchmark Movie',
+                'characters': [{'name': name, 'description': words(self.words, i)}
+                               for i, name in enumerate(CHARACTERS)],
+                'scenes': [{'number': n, 'character': self.scene_character(n), 'setting': words(self.words, n),
+                            'action': words(self.words, n + 1), 'monologue': words(self.words, n + 2)}
+                           for n in numbers],
+            }
+        elif role == 'Character Designer':
+            body = {'prompts': [{'character': name, 'prompt': words(self.words, i)}
+                                for i, name in enumerate(CHARACTERS)]}
+        elif role == 'Scene Designer':
+            body = {'prompts': [{'scene': n, 'characters': [self.scene_character(n)], 'prompt': words(self.words, n)}
+                                for n in numbers]}
+        elif role == 'Music Designer':
+            body = {'prompts': [{'prompt': words(self.words), 'style': 'ambient', 'era': 'modern',
+                                 'duration_seconds': self.scenes * 5}]}
+        elif role == 'Narrator':
+            # Keep narration short enough to pass validation at the default 5s scenes
+            body = {'cues': [{'scene': n, 'text': words(min(self.words, 12), n)} for n in numbers]}
+        else:
+            return 'Benchmark Movie'
+        return json.dumps(body)
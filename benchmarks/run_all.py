@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Run every benchmark offline and write the results as JSON.
+
+Each result is keyed by benchmark name and has at least a "seconds" value, so
+result files from two commits can be compared directly:
+
+    git checkout main && python benchmarks/run_all.py -o baseline.json
+    git checkout my-branch && python benchmarks/run_all.py -o current.json --compare baseline.json
+
+A benchmark that can't run here (e.g. ffmpeg is missing) is recorded with an
+"error" instead of failing the whole suite.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import traceback
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import bench_srt
+import bench_media
+import bench_pipeline
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCHMARK_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(args):
+    suites = {
+        'srt': lambda: bench_srt.run(args.srt_entries),
+        'srt_formatting': lambda: bench_srt.run_formatting(args.srt_entries),
+        'pipeline': lambda: bench_pipeline.run(args.latency, args.scenes, args.words, args.runs),
+        'join_videos': lambda: bench_media.run_join(args.clips, args.clip_seconds),
+        'webp_to_jpg': lambda: bench_media.run_webp(args.images, args.image_size),
+    }
+    results = {}
+    errors = {}
+    for name, suite in suites.items():
+        if args.only and name not in args.only:
+            continue
+        try:
+            results.update(suite())
+        except (Exception, SystemExit) as e:
+            # join_videos exits on errors; don't let one benchmark stop the rest
+            errors[name] = str(e) or traceback.format_exc(limit=1)
+            print(f"Skipped {name}: {errors[name]}")
+    return {
+        'commit': git_commit(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'results': results,
+        'errors': errors,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Print the change in seconds per benchmark; returns the names slower by more than threshold."""
+    regressions = []
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'}:")
+    for name, result in sorted(current['results'].items()):
+        before = baseline.get('results', {}).get(name)
+        if not before or not before.get('seconds'):
+            print(f"  {name:<26} {result['seconds'] * 1000:9.1f} ms  (new)")
+            continue
+        ratio = result['seconds'] / before['seconds']
+        marker = ''
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            marker = '  REGRESSION'
+        print(f"  {name:<26} {before['seconds'] * 1000:9.1f} ms -> {result['seconds'] * 1000:9.1f} ms "
+              f"({ratio:5.2f}x){marker}")
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run all benchmarks and write the results as JSON")
+    parser.add_argument('-o', '--output', default='benchmark_results.json',
+                        help="Results file (default: benchmark_results.json)")
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help="Results file of an earlier run to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Relative slowdown reported as a regression (default: 0.2)")
+    parser.add_argument('--only', nargs='+', choices=('srt', 'srt_formatting', 'pipeline', 'join_videos', 'webp_to_jpg'),
+                        help="Run only these benchmarks")
+    parser.add_argument('--srt-entries', type=int, default=100000, help="Entries in the synthetic SRT (default: 100000)")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds per fake model call (default: 0)")
+    parser.add_argument('--scenes', type=int, default=5, help="Scenes in the fake script (default: 5)")
+    parser.add_argument('--words', type=int, default=20, help="Words per fake text field (default: 20)")
+    parser.add_argument('--runs', type=int, default=3, help="Movies generated per pipeline mode (default: 3)")
+    parser.add_argument('--clips', type=int, default=6, help="Number of test clips (default: 6)")
+    parser.add_argument('--clip-seconds', type=float, default=2, help="Length of each test clip (default: 2)")
+    parser.add_argument('--images', type=int, default=24, help="Number of test images (default: 24)")
+    parser.add_argument('--image-size', type=int, default=1536, help="Test image width and height (default: 1536)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = run_suite(args)
+    with open(args.output, 'w', encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.threshold):
+            sys.exit(1)
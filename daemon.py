@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Long-lived generation server with warm agents, and a thin client to submit jobs to it.
+
+The server imports crewai and builds each worker's MovieScriptGenerator and
+agents once at startup, then takes jobs from a bounded queue over a local
+HTTP API:
+
+    POST   /jobs        {"brief": ..., "id"?, "styles"?, "resume"?, "incremental"?}
+    GET    /jobs        all jobs
+    GET    /jobs/<id>   one job's status (queued, running, done, failed, cancelled)
+    DELETE /jobs/<id>   cancel a job; a running job stops before its next task
+
+The client commands only use the standard library, so submitting a job does
+not pay for importing crewai:
+
+    python daemon.py serve --workers 2 --parallel
+    python daemon.py submit --brief "A cat plans a heist" --wait
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_URL = 'http://127.0.0.1:8765'
+FINISHED_STATUSES = ('done', 'failed', 'cancelled')
+# Jobs may only resume or regenerate movie directories in here
+MOVIES_DIR = 'files'
+
+
+class QueueFull(Exception):
+    """Raised when a job is submitted while max_queue jobs are already waiting."""
+
+
+def check_movie_dir(path):
+    """Return a movie directory from a request, raising ValueError unless it is an existing directory under files/."""
+    root = os.path.realpath(MOVIES_DIR)
+    real = os.path.realpath(path)
+    if real == root or os.path.commonpath([real, root]) != root or not os.path.isdir(real):
+        raise ValueError(f"'{path}' is not a movie directory under {MOVIES_DIR}/")
+    return os.path.relpath(real)
+
+
+def check_request(request):
+    """Raise ValueError unless a job request has the expected types."""
+    if not isinstance(request, dict):
+        raise ValueError("The request body must be a JSON object")
+    for field in ('brief', 'id', 'resume', 'incremental'):
+        if request.get(field) is not None and not isinstance(request[field], str):
+            raise ValueError(f"'{field}' must be a string")
+    styles = request.get('styles')
+    if styles is not None and not isinstance(styles, str) and not (
+            isinstance(styles, list) and all(isinstance(name, str) for name in styles)):
+        raise ValueError("'styles' must be a comma-separated string or a list of names")
+
+
+class JobServer:
+    def __init__(self, workers=2, max_queue=16, max_history=1000, generator_options=None):
+        self.workers = workers
+        self.max_history = max_history
+        self.generator_options = generator_options or {}
+        self.max_queue = max_queue
+        # Jobs waiting for a worker; cancelling a queued job frees its slot right away
+        self.pending = deque()
+        self.jobs = {}
+        self._lock = threading.Lock()
+        self._job_ready = threading.Condition(self._lock)
+        self._stopping = False
+        self._threads = []
+
+    def start(self):
+        """Build one warm generator per worker and start the worker threads."""
+        from filmcrew import MovieScriptGenerator
+
+        for i in range(self.workers):
+            generator = MovieScriptGenerator(**self.generator_options)
+            generator.get_agents()
+            thread = threading.Thread(target=self.work, args=(generator,), name=f"worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Let the workers finish their current job, then stop them."""
+        with self._lock:
+            self._stopping = True
+            self._job_ready.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+    def submit(self, request):
+        """Queue a job. Raises ValueError for an invalid request and QueueFull when the queue is full."""
+        check_request(request)
+        brief = request.get('brief')
+        # The run reads and renames these directories, so keep them inside files/
+        resume_dir = check_movie_dir(request['resume']) if request.get('resume') else None
+        incremental_dir = check_movie_dir(request['incremental']) if request.get('incremental') else None
+        if not (brief or resume_dir or incremental_dir):
+            raise ValueError("A job needs a brief, or a movie directory to resume or regenerate")
+        if resume_dir and incremental_dir:
+            raise ValueError("resume and incremental can't be combined")
+        styles = None
+        if request.get('styles'):
+            from filmcrew import select_style_presets
+            names = request['styles']
+            styles = select_style_presets(names.split(',') if isinstance(names, str) else names)
+
+        job_id = str(request.get('id') or uuid.uuid4().hex[:12])
+        # The id ends up in the movie directory name
+        from filmcrew import check_movie_id
+        check_movie_id(job_id)
+        with self._lock:
+            if job_id in self.jobs and self.jobs[job_id]['status'] not in FINISHED_STATUSES:
+                raise ValueError(f"Job {job_id} is already queued or running")
+            if len(self.pending) >= self.max_queue:
+                raise QueueFull(f"{len(self.pending)} jobs are already waiting")
+            job = {
+                'id': job_id, 'status': 'queued', 'brief': brief, 'movie_dir': None, 'error': None,
+                'submitted': time.time(), 'started': None, 'finished': None,
+                '_options': {'brief': brief, 'resume_dir': resume_dir, 'incremental_dir': incremental_dir,
+                             'styles': styles},
+                '_cancel': threading.Event(),
+            }
+            self.pending.append(job)
+            self.jobs[job_id] = job
+            self.prune()
+            self._job_ready.notify()
+        return self.describe(job)
+
+    def prune(self):
+        """Forget the oldest finished jobs beyond max_history."""
+        finished = [job for job in self.jobs.values() if job['status'] in FINISHED_STATUSES]
+        for job in sorted(finished, key=lambda job: job['submitted'])[:max(0, len(self.jobs) - self.max_history)]:
+            del self.jobs[job['id']]
+
+    def work(self, generator):
+        from filmcrew import RunCancelled
+
+        while True:
+            with self._lock:
+                while not self.pending and not self._stopping:
+                    self._job_ready.wait()
+                if self._stopping:
+                    return
+                job = self.pending.popleft()
+                job['status'] = 'running'
+                job['started'] = time.time()
+                job['_generator'] = generator
+                options = job.pop('_options')
+                # Forget the previous job's run, so a job failing before it has a directory doesn't report one
+                generator.manifest = None
+                generator.movie_dir = None
+            generator.cancel_event = job['_cancel']
+            try:
+                generator.run(movie_id=None if options['resume_dir'] or options['incremental_dir'] else job['id'],
+                              **options)
+                status, error = 'done', None
+            except RunCancelled as e:
+                status, error = 'cancelled', str(e)
+            except Exception as e:
+                # A failed job must not take down the worker
+                status, error = 'failed', str(e)
+            finally:
+                generator.cancel_event = None
+            with self._lock:
+                job.update(status=status, error=error, movie_dir=generator.movie_dir, finished=time.time())
+                job.pop('_cancel', None)
+                job.pop('_generator', None)
+            print(f"[{status}] job {job['id']}")
+
+    def cancel(self, job_id):
+        """Cancel a queued job, or ask a running one to stop before its next task."""
+        with self._lock:
+            job = self.jobs[job_id]
+            if job['status'] == 'queued':
+                self.pending.remove(job)
+                job.update(status='cancelled', finished=time.time())
+                job.pop('_options', None)
+                job.pop('_cancel', None)
+            elif job['status'] == 'running':
+                job['_cancel'].set()
+                job['cancel_requested'] = True
+            return self.describe(job)
+
+    def describe(self, job):
+        """Public view of a job, with task progress while it runs."""
+        result = {key: value for key, value in job.items() if not key.startswith('_')}
+        generator = job.get('_generator')
+        if generator is not None and generator.manifest is not None:
+            result['movie_dir'] = generator.movie_dir
+            result['tasks_done'] = len(generator.manifest.get('tasks', {}))
+        return result
+
+    def status(self, job_id=None):
+        with self._lock:
+            if job_id is not None:
+                return self.describe(self.jobs[job_id])
+            return [self.describe(job) for job in self.jobs.values()]
+
+
+def make_handler(server):
+    class Handler(BaseHTTPRequestHandler):
+        def send_json(self, status, body):
+            payload = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def route(self):
+            return urllib.parse.urlsplit(self.path).path
+
+        def job_id(self):
+            parts = self.route().strip('/').split('/')
+            if parts[0] != 'jobs' or len(parts) > 2:
+                return None, False
+            return (parts[1] if len(parts) == 2 else None), True
+
+        def do_GET(self):
+            if self.route() == '/health':
+                return self.send_json(200, {'status': 'ok', 'workers': server.workers,
+                                            'queued': len(server.pending)})
+            job_id, valid = self.job_id()
+            if not valid:
+                return self.send_json(404, {'error': 'Not found'})
+            try:
+                self.send_json(200, server.status(job_id))
+            except KeyError:
+                self.send_json(404, {'error': f"Unknown job {job_id}"})
+
+        def do_POST(self):
+            if self.route().rstrip('/') != '/jobs':
+                return self.send_json(404, {'error': 'Not found'})
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+                self.send_json(202, server.submit(request))
+            except QueueFull as e:
+                self.send_json(503, {'error': f"Job queue is full, try again later ({str(e)})"})
+            except (ValueError, OSError) as e:
+                self.send_json(400, {'error': str(e)})
+
+        def do_DELETE(self):
+            job_id, valid = self.job_id()
+            if not valid or job_id is None:
+                return self.send_json(404, {'error': 'Not found'})
+            try:
+                self.send_json(200, server.cancel(job_id))
+            except KeyError:
+                self.send_json(404, {'error': f"Unknown job {job_id}"})
+
+        def log_message(self, format, *args):
+            # Status polling would flood the log
+            pass
+
+    return Handler
+
+
+def serve(args):
+    from batch import RateLimiter
+    from filmcrew import build_cache, build_catalog
+
+    server = JobServer(
+        workers=args.workers,
+        max_queue=args.max_queue,
+        generator_options={
+            'parallel': args.parallel,
+            'max_concurrency': args.max_concurrency,
+            'scene_duration': args.scene_duration,
+            'max_repairs': args.max_repairs,
+            'cache': build_cache(args),
+            'rate_limiter': RateLimiter(args.rpm, args.tpm),
+            'catalog': build_catalog(args),
+        },
+    )
+    server.start()
+    httpd = ThreadingHTTPServer((args.host, args.port), make_handler(server))
+    print(f"Serving on http://{args.host}:{args.port} with {args.workers} workers")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("Shutting down after the running jobs finish")
+    finally:
+        httpd.server_close()
+        server.stop()
+
+
+def request(url, method='GET', body=None):
+    """Call the server's API and return (HTTP status, decoded JSON body)."""
+    data = json.dumps(body).encode('utf-8') if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method, headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+def wait_for(url, job_id, poll_interval):
+    """Poll a job until it finishes, printing progress; returns its final status."""
+    last = None
+    while True:
+        _, job = request(f"{url}/jobs/{job_id}")
+        progress = (job['status'], job.get('tasks_done'))
+        if progress != last:
+            done = f" ({job['tasks_done']} tasks done)" if job.get('tasks_done') is not None else ""
+            print(f"Job {job_id}: {job['status']}{done}")
+            last = progress
+        if job['status'] in FINISHED_STATUSES:
+            return job
+        time.sleep(poll_interval)
+
+
+def client(args):
+    url = args.url.rstrip('/')
+    try:
+        if args.command == 'submit':
+            body = {key: value for key, value in (('brief', args.brief), ('id', args.id), ('styles', args.styles),
+                                                  ('resume', args.resume), ('incremental', args.incremental))
+                    if value}
+            status, job = request(f"{url}/jobs", 'POST', body)
+            if status != 202:
+                print(f"Error: {job['error']}")
+                sys.exit(1)
+            print(f"Submitted job {job['id']}")
+            if args.wait:
+                job = wait_for(url, job['id'], args.poll_interval)
+                print(json.dumps(job, indent=2))
+                if job['status'] != 'done':
+                    sys.exit(1)
+        elif args.command in ('status', 'list'):
+            status, body = request(f"{url}/jobs/{args.job_id}" if args.command == 'status' else f"{url}/jobs")
+            print(json.dumps(body, indent=2))
+            if status != 200:
+                sys.exit(1)
+        elif args.command == 'cancel':
+            status, body = request(f"{url}/jobs/{args.job_id}", 'DELETE')
+            print(json.dumps(body, indent=2))
+            if status != 200:
+                sys.exit(1)
+    except urllib.error.URLError as e:
+        print(f"Error: could not reach the server at {url}: {e.reason}")
+        sys.exit(1)
+
+
+def parse_args(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser = argparse.ArgumentParser(description="Movie generation server and client")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = commands.add_parser('serve', help="Start the server with warm agents")
+    serve_parser.add_argument('--host', default='127.0.0.1', help="Address to listen on (default: 127.0.0.1)")
+    serve_parser.add_argument('--port', type=int, default=8765, help="Port to listen on (default: 8765)")
+    serve_parser.add_argument('--rpm', type=int, help="Global limit on model requests per minute")
+    serve_parser.add_argument('--tpm', type=int, help="Global limit on model tokens per minute")
+    if argv[:1] == ['serve']:
+        # Only the server needs crewai; the client commands start without importing it
+        from filmcrew import add_generator_arguments, positive_int
+        serve_parser.add_argument('--workers', type=positive_int, default=2,
+                                  help="Number of movies generated at once (default: 2)")
+        serve_parser.add_argument('--max-queue', type=positive_int, default=16,
+                                  help="Jobs waiting beyond this many are rejected (default: 16)")
+        add_generator_arguments(serve_parser)
+
+    submit_parser = commands.add_parser('submit', help="Submit a movie job")
+    submit_parser.add_argument('--brief', help="Story brief the script has to follow")
+    submit_parser.add_argument('--id', help="Job id (letters, digits, '_' and '-'), also used in the movie directory name")
+    submit_parser.add_argument('--styles', help="Comma-separated style presets (or 'all')")
+    submit_parser.add_argument('--resume', metavar='MOVIE_DIR', help="Resume an interrupted run")
+    submit_parser.add_argument('--incremental', metavar='MOVIE_DIR', help="Regenerate a movie directory in place")
+    submit_parser.add_argument('--wait', action='store_true', help="Wait for the job to finish")
+    submit_parser.add_argument('--poll-interval', type=float, default=2.0,
+                               help="Seconds between status checks with --wait (default: 2)")
+
+    for name, help_text in (('status', "Show a job's status"), ('cancel', "Cancel a job")):
+        command_parser = commands.add_parser(name, help=help_text)
+        command_parser.add_argument('job_id')
+    commands.add_parser('list', help="List all jobs")
+
+    for name, command_parser in commands.choices.items():
+        if name != 'serve':
+            command_parser.add_argument('--url', default=DEFAULT_URL,
+                                        help=f"Server address (default: {DEFAULT_URL})")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.command == 'serve':
+        serve(args)
+    else:
+        client(args)
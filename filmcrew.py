@@ -1,14 +1,228 @@
 import os
+import sys
+import json
+import time
+import uuid
+import sqlite3
+import subprocess
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from dotenv import load_dotenv
-from crewai import Agent, Task, Crew, Process
+from crewai import Agent, Task
+from crewai.tasks.task_output import TaskOutput
+from crewai.tasks.output_format import OutputFormat
+from crewai.utilities.converter import ConverterError
 from textwrap import dedent
 from datetime import datetime
-from typing import Any
-from pydantic import BaseModel
+from functools import lru_cache
+from typing import Any, List
+from pydantic import BaseModel, Field
+from response_cache import ResponseCache
+from tracing import TRACE_FILENAME, RunTrace, OtelFileExporter, estimate_cost, format_summary
+from run_catalog import DEFAULT_CATALOG, RunCatalog, created_iso, file_digest
+from image_generation import add_image_arguments, check_image_arguments, generate_images
+from assemble import add_assemble_arguments, assemble_movie, assemble_options, check_assemble_arguments
+from srt_utils import build_srt, save_srt_file, validate_srt
 
 # Load environment variables
 load_dotenv()
 
+# Output file name (without extension) for each agent's task
+ROLE_TO_FILENAME = {
+    'Character Designer': 'characters',
+    'Music Designer': 'music',
+    'Narrator': 'narration',
+    'Scene Designer': 'scenes',
+    'Story Writer': 'story',
+    'Title Generator': 'title'
+}
+
+MANIFEST_FILENAME = 'manifest.json'
+STYLES_FILENAME = 'styles.json'
+STYLE_PRESETS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'video-style-options.json')
+
+# Scenes in the script when no scene clips are given
+DEFAULT_SCENE_COUNT = 5
+
+# Upper bound for narration to still be readable aloud within its scene
+NARRATION_WORDS_PER_SECOND = 3.0
+
+# Fields of the script that each downstream task reads, instead of the whole script
+SCRIPT_CONTEXT_FIELDS = {
+    'characters': {'characters'},
+    'scenes': {'characters', 'scenes'},
+    'music': {'scenes'},
+    'narration': {'scenes'},
+    'title': {'characters', 'scenes'},
+}
+
+class Character(BaseModel):
+    name: str
+    description: str = Field(description="Appearance, personality and role in the story")
+
+class Scene(BaseModel):
+    number: int
+    character: str = Field(description="The one character appearing in this scene")
+    setting: str
+    action: str
+    monologue: str = ""
+
+class Script(BaseModel):
+    title: str
+    characters: List[Character]
+    scenes: List[Scene]
+
+    def to_text(self):
+        lines = [f"Title: {self.title}", "", "Characters:"]
+        lines += [f"- {character.name}: {character.description}" for character in self.characters]
+        for scene in self.scenes:
+            lines += ["", f"Scene {scene.number} ({scene.character})",
+                      f"Setting: {scene.setting}", f"Action: {scene.action}"]
+            if scene.monologue:
+                lines.append(f"Monologue: {scene.monologue}")
+        return "\n".join(lines)
+
+class CharacterPrompt(BaseModel):
+    character: str
+    prompt: str
+
+class CharacterPrompts(BaseModel):
+    prompts: List[CharacterPrompt]
+
+    def to_text(self):
+        return "\n\n".join(f"{p.character}: {p.prompt}" for p in self.prompts)
+
+class ScenePrompt(BaseModel):
+    scene: int
+    characters: List[str] = Field(description="Characters present in the scene")
+    prompt: str
+
+class ScenePrompts(BaseModel):
+    prompts: List[ScenePrompt]
+
+    def to_text(self):
+        return "\n\n".join(
+            f"Characters in scene: {', '.join(p.characters)}. {p.prompt}"
+            for p in sorted(self.prompts, key=lambda p: p.scene)
+        )
+
+class MusicPrompt(BaseModel):
+    prompt: str
+    style: str
+    era: str
+    duration_seconds: int
+
+class MusicPrompts(BaseModel):
+    prompts: List[MusicPrompt]
+
+    def to_text(self):
+        return "\n\n".join(
+            f"{p.prompt} (style: {p.style}, era: {p.era}, duration: {p.duration_seconds}s)"
+            for p in self.prompts
+        )
+
+class NarrationCue(BaseModel):
+    scene: int
+    text: str = Field(description="Narration spoken over the scene, without timestamps")
+
+class Narration(BaseModel):
+    cues: List[NarrationCue]
+
+    def ordered_cues(self):
+        return sorted(self.cues, key=lambda cue: cue.scene)
+
+    def to_text(self):
+        return "\n\n".join(f"Scene {cue.scene}: {cue.text}" for cue in self.ordered_cues())
+
+    def to_srt(self, durations):
+        """Build SRT subtitles locally, one entry per cue in scene order, from the scene durations in seconds."""
+        return build_srt([cue.text for cue in self.ordered_cues()], durations)
+
+def output_text(output):
+    """Canonical text of a task output: JSON for structured outputs, cleaned raw text otherwise."""
+    if output.pydantic is not None:
+        return output.pydantic.model_dump_json()
+    return clean_output(output.raw)
+
+def atomic_write(filepath, content):
+    """Write content to a file so readers never see a partially written file."""
+    tmp_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w', encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, filepath)
+
+def clean_output(content):
+    """Normalize a task output the way it is saved to disk."""
+    content_str = str(content).strip()
+    # Remove triple backticks if present at start and end
+    if content_str.startswith('```') and content_str.endswith('```'):
+        content_str = content_str[3:-3].strip()
+    return content_str
+
+def role_key(agent_role):
+    """Default output name for an agent's task."""
+    return ROLE_TO_FILENAME.get(agent_role, agent_role.lower().replace(' ', '_'))
+
+def task_key(task):
+    """Name under which a task's output is saved and tracked in the run manifest."""
+    return task.name or role_key(task.agent.role)
+
+def slugify(text):
+    """Lowercase filesystem-safe version of a name, e.g. 'Infinite Zoom' -> 'infinite_zoom'."""
+    return "".join(c if c.isalnum() else '_' for c in text.strip().lower()).strip('_')
+
+def check_movie_id(movie_id):
+    """Raise ValueError unless a movie id is safe to put in a directory name (letters, digits, '_' and '-')."""
+    if not movie_id or not all(c.isascii() and (c.isalnum() or c in '_-') for c in movie_id):
+        raise ValueError(f"Invalid id '{movie_id}': use only letters, digits, '_' and '-'")
+
+@lru_cache(maxsize=None)
+def load_style_presets(path=STYLE_PRESETS_FILE):
+    """Load and validate the video style presets once per path.
+
+    Returns:
+        Tuple of preset dicts with a 'name' and 'prompt', and optionally a 'model'
+        and 'modelInput' for the video generation step
+    """
+    with open(path, encoding="utf-8") as f:
+        presets = json.load(f)
+    if not isinstance(presets, list) or not presets:
+        raise ValueError(f"{path} must contain a non-empty list of style presets")
+
+    names = set()
+    for i, preset in enumerate(presets):
+        if not isinstance(preset, dict):
+            raise ValueError(f"Style preset {i} in {path} is not an object")
+        for field in ('name', 'prompt'):
+            if not isinstance(preset.get(field), str) or not preset[field].strip():
+                raise ValueError(f"Style preset {i} in {path} needs a non-empty '{field}'")
+        if 'model' in preset and not isinstance(preset['model'], str):
+            raise ValueError(f"Style preset '{preset['name']}' has a non-string 'model'")
+        if 'modelInput' in preset and not isinstance(preset['modelInput'], dict):
+            raise ValueError(f"Style preset '{preset['name']}' has a non-object 'modelInput'")
+        if slugify(preset['name']) in names:
+            raise ValueError(f"Duplicate style preset '{preset['name']}' in {path}")
+        names.add(slugify(preset['name']))
+    return tuple(presets)
+
+def select_style_presets(names, path=STYLE_PRESETS_FILE):
+    """Pick presets by name from the presets file; 'all' selects every preset."""
+    presets = load_style_presets(path)
+    if names == ['all']:
+        return list(presets)
+    by_slug = {slugify(preset['name']): preset for preset in presets}
+    selected = []
+    for name in names:
+        if slugify(name) not in by_slug:
+            available = ', '.join(preset['name'] for preset in presets)
+            raise ValueError(f"Unknown style '{name}'. Available styles: {available}")
+        selected.append(by_slug[slugify(name)])
+    return selected
+
+class RunCancelled(Exception):
+    """Raised by MovieScriptGenerator.run when its cancel_event is set."""
+
 class ResultSaver(Agent):
     def __init__(self):
         # Initialize parent class first
@@ -27,13 +241,14 @@ class ResultSaver(Agent):
     def set_movie_dir(self, movie_dir):
         self._movie_directory = movie_dir
 
-    def save_result(self, movie_timestamp: str, agent_role: str, content: Any) -> str:
+    def save_result(self, movie_timestamp: str, agent_role: str, content: Any, name: str = None) -> str:
         """Save an agent's output to a file.
         
         Args:
             movie_timestamp: Timestamp identifier for the movie
             agent_role: Role of the agent whose output is being saved
             content: Content to save (can be string or TaskOutput)
+            name: Output name to use instead of the one derived from agent_role
             
         Returns:
             Path to the saved file
@@ -42,15 +257,7 @@ class ResultSaver(Agent):
             raise ValueError("Movie directory not set. Call set_movie_dir first.")
 
         # Create filename from agent role
-        role_to_filename = {
-            'Character Designer': 'characters',
-            'Music Designer': 'music',
-            'Narrator': 'narration',
-            'Scene Designer': 'scenes',
-            'Story Writer': 'story',
-            'Title Generator': 'title'
-        }
-        filename = f"{role_to_filename.get(agent_role, agent_role.lower().replace(' ', '_'))}.txt"
+        filename = f"{name or role_key(agent_role)}.txt"
         
         # Create full path
         filepath = os.path.join(self._movie_directory, filename)
@@ -58,22 +265,83 @@ class ResultSaver(Agent):
         # Ensure directory exists
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
         
+        # Structured outputs are saved as JSON, with a readable rendering in the .txt file
+        pydantic_output = getattr(content, 'pydantic', None)
+        if pydantic_output is not None:
+            atomic_write(os.path.splitext(filepath)[0] + '.json', pydantic_output.model_dump_json(indent=2))
+            content = pydantic_output.to_text()
+
         # Write content to file
-        with open(filepath, 'w') as f:
-            content_str = str(content)
-            # Remove triple backticks if present at start and end
-            content_str = content_str.strip()
-            if content_str.startswith('```') and content_str.endswith('```'):
-                content_str = content_str[3:-3].strip()
-            f.write(content_str)
+        atomic_write(filepath, clean_output(content))
             
         return filepath
 
+    def save_manifest(self, manifest: dict) -> str:
+        """Atomically write the run manifest into the movie directory."""
+        if not self._movie_directory:
+            raise ValueError("Movie directory not set. Call set_movie_dir first.")
+        filepath = os.path.join(self._movie_directory, MANIFEST_FILENAME)
+        atomic_write(filepath, json.dumps(manifest, indent=2))
+        return filepath
+
+    @staticmethod
+    def load_manifest(movie_dir: str) -> dict:
+        """Read the run manifest of a movie directory."""
+        with open(os.path.join(movie_dir, MANIFEST_FILENAME), encoding="utf-8") as f:
+            return json.load(f)
+
 class MovieScriptGenerator:
-    def __init__(self):
+    def __init__(self, parallel=False, max_concurrency=4, cache=None, rate_limiter=None,
+                 scene_duration=5.0, clip_files=None, max_repairs=2, otel_file=None, llm=None,
+                 verbose=True, catalog=None):
         self.openai_api_key = os.getenv('OPENAI_API_KEY')
         self.openai_model_name = os.getenv('OPENAI_MODEL_NAME')
         self.movie_dir = None
+        # Run independent tasks concurrently instead of one after another
+        self.parallel = parallel
+        self.max_concurrency = max_concurrency
+        # Optional ResponseCache; when set, identical task inputs reuse the stored response
+        self.cache = cache
+        # Optional shared limiter (see batch.RateLimiter) acquired before every model call
+        self.rate_limiter = rate_limiter
+        # Subtitle timing: scene clips to probe for their lengths, else a fixed length per scene
+        self.scene_duration = scene_duration
+        self.clip_files = clip_files
+        self._clip_durations = None
+        # Outputs failing their task's validator are sent back to the agent at most this many times
+        self.max_repairs = max_repairs
+        self.validators = {
+            'story': self.validate_script,
+            'scenes': self.validate_scene_prompts,
+            'narration': self.validate_narration,
+        }
+        self.agents = None
+        # Run manifest of the current movie, updated as each task completes
+        self.manifest = None
+        self._manifest_lock = threading.Lock()
+        # Incremental runs: task key -> (input fingerprint, output) from the previous run
+        self.previous_outputs = {}
+        # Instrumentation: the current run's trace, and the span of each task being executed
+        self.otel_exporter = OtelFileExporter(otel_file) if otel_file else None
+        self.trace = None
+        self.task_spans = {}
+        # Per LLM usage counter: calls in flight, and how many calls started while another was running
+        self._llm_activity = {}
+        self._llm_activity_lock = threading.Lock()
+        # Optional LLM shared by every agent instead of the default from OPENAI_MODEL_NAME
+        # (e.g. a local model, or a stub for benchmarks), and whether agents log their steps
+        self.llm = llm
+        self.verbose = verbose
+        # Optional threading.Event; once set, no further tasks are started and run() raises RunCancelled
+        self.cancel_event = None
+        # Optional RunCatalog (shareable between generators) recording every run and task output
+        self.catalog = catalog
+
+    def get_agents(self):
+        """Return this generator's agents, creating them on first use so later runs reuse them."""
+        if self.agents is None:
+            self.agents = self.create_agents()
+        return self.agents
         
     def create_agents(self):
         # Story Writer Agent
@@ -82,7 +350,7 @@ class MovieScriptGenerator:
             goal='Write a compelling short movie script with clear scenes and characters',
             backstory="""You are an experienced screenwriter who specializes in creating 
             engaging short films. You focus on creating clear, vivid scenes and memorable characters.""",
-            verbose=True,
+            verbose=self.verbose,
             allow_delegation=False
         )
 
@@ -93,7 +361,7 @@ class MovieScriptGenerator:
             backstory="""You are a creative title specialist who excels at crafting memorable 
             and appropriate titles for movies. You analyze scripts and create titles that capture 
             the essence of the story while being catchy and marketable.""",
-            verbose=True,
+            verbose=self.verbose,
             allow_delegation=False
         )
 
@@ -105,7 +373,7 @@ class MovieScriptGenerator:
             that can be turned into stunning AI-generated images. For each character in 
             the script, you create exactly one detailed prompt that will generate a 
             consistent, high-quality character portrait.""",
-            verbose=True,
+            verbose=self.verbose,
             allow_delegation=False
         )
 
@@ -118,7 +386,7 @@ class MovieScriptGenerator:
             For each scene in the script, you create exactly one detailed prompt that will 
             feature strictly one character - no more, no less. Each scene must focus on a single 
             character to maintain simplicity and clarity in the visual narrative.""",
-            verbose=True,
+            verbose=self.verbose,
             allow_delegation=False
         )
 
@@ -129,37 +397,60 @@ class MovieScriptGenerator:
             backstory="""You are a skilled music composer who excels at creating prompts 
             for AI music generation. You understand how to match music to the mood and 
             theme of each scene while maintaining consistency throughout the movie.""",
-            verbose=True,
+            verbose=self.verbose,
             allow_delegation=False
         )
 
         # Narrator Agent
         narrator = Agent(
             role='Narrator',
-            goal='Create SRT subtitles for the movie with precise 5-second scene timing',
-            backstory="""You are an expert narrator who creates precisely timed subtitles 
-            for movies. You understand how to break down scenes into properly timed 
-            segments with clear, engaging narration. You are especially skilled at 
-            creating concise narration that fits within strict time constraints, ensuring 
-            each scene is exactly 5 seconds or less.""",
-            verbose=True,
+            goal='Write concise narration for every scene that fits its time slot',
+            backstory="""You are an expert narrator who writes the narration for 
+            movies. You understand how to break a story down scene by scene with clear, 
+            engaging narration. You are especially skilled at creating concise narration 
+            that can be read aloud within strict time constraints.""",
+            verbose=self.verbose,
             allow_delegation=False
         )
 
+        if self.llm is not None:
+            for agent in (story_writer, character_designer, scene_designer, music_designer, narrator, title_generator):
+                agent.llm = self.llm
+
         # Result Saver Agent
         result_saver = ResultSaver()
 
         return story_writer, character_designer, scene_designer, music_designer, narrator, title_generator, result_saver
 
-    def create_tasks(self, story_writer, character_designer, scene_designer, music_designer, narrator, title_generator):
-        # Generate movie name and timestamp once for all tasks
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        movie_name = f"movie_{timestamp}"
+    def scene_durations(self):
+        """Return the length of each scene in seconds, or None if scenes last scene_duration each.
+
+        The scene clips are probed once; the lengths are reused for the rest of the run.
+        """
+        if not self.clip_files:
+            return None
+        if self._clip_durations is None or self._clip_durations[0] != list(self.clip_files):
+            from join_videos import probe_durations
+            self._clip_durations = (list(self.clip_files), probe_durations(self.clip_files))
+        return self._clip_durations[1]
+
+    def create_tasks(self, story_writer, character_designer, scene_designer, music_designer, narrator, title_generator, brief=None):
+        # The script and narration are sized to the scene clips, so the subtitles can be timed to them
+        durations = self.scene_durations()
+        if durations:
+            scene_count = len(durations)
+            scene_length = f"timed to clips of {', '.join(f'{d:.1f}' for d in durations)} seconds"
+            narration_length = "within its scene's length: " + ", ".join(
+                f"scene {i} {d:.1f}s" for i, d in enumerate(durations, start=1))
+        else:
+            scene_count = DEFAULT_SCENE_COUNT
+            scene_length = f"each scene max {self.scene_duration:g} seconds"
+            narration_length = f"within {self.scene_duration:g} seconds"
 
         # Task 1: Write the script
         write_script = Task(
-            description=dedent("""
-                Write a short movie script (5 scenes, each scene max 5 seconds).
+            description=dedent(f"""
+                Write a short movie script (exactly {scene_count} scenes, {scene_length}).
                 Requirements:
                 1. Maximum 2 unique characters total for all scenes
                 2. Exactly one character per scene - no exceptions
@@ -170,17 +461,20 @@ class MovieScriptGenerator:
                 Output format:
                 1. Title
                 2. Character list with descriptions (max 2 characters)
-                3. 5 scenes with clear descriptions
+                3. {scene_count} scenes with clear descriptions
                 4. Exactly one character and their actions/monologue per scene
                 5. At least one character appearing in multiple scenes"""),
             agent=story_writer,
-            expected_output="""A well-structured movie script containing:
+            output_pydantic=Script,
+            expected_output=f"""A well-structured movie script containing:
                 - Title
                 - Character list with descriptions (max 2 characters)
-                - 5 scenes with clear descriptions
+                - {scene_count} scenes with clear descriptions
                 - Exactly one character and their actions/monologue per scene
                 - At least one character appearing in multiple scenes"""
         )
+        if brief:
+            write_script.description += f"\n\nThe story must follow this brief:\n{brief}"
 
         # Task 2: Create character prompts
         create_character_prompts = Task(
@@ -191,6 +485,8 @@ class MovieScriptGenerator:
                 2. Include physical appearance, clothing, and expression
                 3. Specify artistic style and quality parameters"""),
             agent=character_designer,
+            context=[write_script],
+            output_pydantic=CharacterPrompts,
             expected_output="""A list of image generation prompts:
                 - One detailed prompt per character
                 - Physical descriptions
@@ -209,6 +505,8 @@ class MovieScriptGenerator:
                 4. Include setting, lighting, and camera angle
                 5. Specify artistic style and quality parameters"""),
             agent=scene_designer,
+            context=[write_script],
+            output_pydantic=ScenePrompts,
             expected_output="""A list of image generation prompts:
                 - One detailed prompt per scene
                 - Explicit list of characters present in the scene
@@ -225,6 +523,8 @@ class MovieScriptGenerator:
                 2. Specify duration, style, and era
                 3. Consider scene transitions"""),
             agent=music_designer,
+            context=[write_script],
+            output_pydantic=MusicPrompts,
             expected_output="""A list of music generation prompts that:
                 - Match movie mood and theme
                 - Specify duration and style
@@ -234,20 +534,16 @@ class MovieScriptGenerator:
         # Task 5: Create narration
         create_narration = Task(
             description=dedent(f"""
-                Create SRT subtitles for the entire movie, with each scene exactly 5 seconds or less.
-                
-                Using movie directory: {self.movie_dir}
-                1. Create appropriate subtitles that enhance the viewing experience
-                2. Ensure each subtitle entry follows proper SRT format with timestamps and sequential numbering
-                3. IMPORTANT: Each scene MUST be exactly 5 seconds or less
+                Write the narration for the movie, exactly one entry per scene in the script.
                 
-                Each subtitle entry should:
-                - Have sequential numbering
-                - Include proper timestamps (HH:MM:SS,mmm --> HH:MM:SS,mmm)
-                - Contain clear, concise narration text that fits within the 5-second limit
-                - Start each new scene at a multiple of 5 seconds (e.g., 00:00:00,000, 00:00:05,000, etc.)"""),
+                1. Create narration that enhances the viewing experience
+                2. IMPORTANT: Each scene's narration must be short enough to read aloud {narration_length}
+                3. Provide only the scene number and the narration text - no timestamps, numbering or SRT formatting;
+                   subtitle timing is added automatically"""),
             agent=narrator,
-            expected_output="""A complete SRT file with properly formatted subtitle entries, each scene exactly 5 seconds or less."""
+            context=[write_script],
+            output_pydantic=Narration,
+            expected_output="""One short narration text per scene, in scene order."""
         )
 
         # Task 6: Generate title
@@ -257,6 +553,7 @@ class MovieScriptGenerator:
                 The title should be memorable, appropriate, and capture the essence of the story.
                 Provide ONLY the title, without any additional explanation or formatting."""),
             agent=title_generator,
+            context=[write_script],
             expected_output="A concise and compelling movie title"
         )
 
@@ -275,50 +572,889 @@ class MovieScriptGenerator:
             f.write(content)
         return filepath
 
-    def run(self):
-        # Create agents
-        story_writer, character_designer, scene_designer, music_designer, narrator, title_generator, result_saver = self.create_agents()
-        
-        # Create tasks
-        tasks = self.create_tasks(story_writer, character_designer, scene_designer, music_designer, narrator, title_generator)
-        
-        # Create crew and execute
-        crew = Crew(
-            agents=[story_writer, character_designer, scene_designer, music_designer, narrator, title_generator, result_saver],
-            tasks=tasks,
-            verbose=True
+    def task_context(self, task):
+        """Join the outputs of the tasks this task depends on into a context string.
+
+        Of a structured script, only the fields the task needs are passed on.
+        """
+        dependencies = task.context if isinstance(task.context, list) else []
+        fields = SCRIPT_CONTEXT_FIELDS.get(role_key(task.agent.role))
+        outputs = []
+        for dep in dependencies:
+            if dep.output is None:
+                continue
+            if isinstance(dep.output.pydantic, Script) and fields:
+                outputs.append(dep.output.pydantic.model_dump_json(include=fields))
+            else:
+                outputs.append(dep.output.raw)
+        return "\n\n----------\n\n".join(outputs)
+
+    def llm_settings(self, task):
+        """Return the model name and sampling parameters a task's agent calls the LLM with."""
+        llm = task.agent.llm
+        model = getattr(llm, 'model', None) or self.openai_model_name
+        sampling_params = {
+            name: getattr(llm, name, None)
+            for name in ('temperature', 'top_p', 'max_tokens', 'seed')
+        }
+        return model, sampling_params
+
+    def cache_key(self, task, context):
+        """Build the response cache key for a task given its upstream context."""
+        model, sampling_params = self.llm_settings(task)
+        description = f"{task.description}\n{task.expected_output}"
+        return ResponseCache.make_key(task.agent.role, description, context, model, sampling_params)
+
+    def input_fingerprint(self, task):
+        """Hash everything a task's output depends on: its description, agent config and upstream outputs.
+
+        Upstream outputs are hashed in their saved form, so outputs restored from a movie
+        directory fingerprint the same as freshly generated ones.
+        """
+        model, sampling_params = self.llm_settings(task)
+        dependencies = task.context if isinstance(task.context, list) else []
+        upstream = "\n\n----------\n\n".join(
+            output_text(dep.output) for dep in dependencies if dep.output is not None
         )
-        
-        result = crew.kickoff()
-        
-        # Get the generated title from the title task
-        title_task = tasks[-1]  # Last task is the title generation task
-        movie_title = str(title_task.output).strip() if title_task.output else "Untitled"
-        
-        # Get current timestamp for the movie directory
+        description = f"{task.description}\n{task.expected_output}"
+        agent_config = {'goal': task.agent.goal, 'backstory': task.agent.backstory}
+        return ResponseCache.make_key(task.agent.role, description, upstream, model, sampling_params,
+                                      agent_config=agent_config)
+
+    def estimate_tokens(self, task, context):
+        """Roughly estimate the tokens a task will use, for rate limiting (~4 characters per token)."""
+        prompt_chars = len(task.description) + len(task.expected_output) + len(context or "")
+        completion_tokens = getattr(task.agent.llm, 'max_tokens', None) or 1024
+        return prompt_chars // 4 + completion_tokens
+
+    def call_model(self, task, context):
+        """Execute a task against the model, waiting for the rate limiter first if one is set."""
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(self.estimate_tokens(task, context))
+        llm = task.agent.llm
+        # Agent.copy() gives a style task a shallow copy of the LLM that shares its usage
+        # counter, so activity is tracked per counter rather than per LLM object
+        counter = getattr(llm, '_token_usage', llm)
+        with self._llm_activity_lock:
+            activity = self._llm_activity.setdefault(id(counter), {'running': 0, 'overlaps': 0})
+            # An LLM shared between agents counts the tokens of every task running on it
+            running_alone = activity['running'] == 0
+            if not running_alone:
+                activity['overlaps'] += 1
+            activity['running'] += 1
+            overlaps_before = activity['overlaps']
+            usage_before = self.token_usage(llm)
+        try:
+            output = task.execute_sync(context=context)
+        finally:
+            with self._llm_activity_lock:
+                activity['running'] -= 1
+                usage_after = self.token_usage(llm)
+                exclusive = running_alone and activity['overlaps'] == overlaps_before
+
+        span = self.task_spans.get(task_key(task))
+        if span is not None:
+            span['model_calls'] += 1
+            if (exclusive and usage_before is not None and usage_after is not None
+                    and usage_after != usage_before):
+                span['prompt_tokens'] += usage_after[0] - usage_before[0]
+                span['completion_tokens'] += usage_after[1] - usage_before[1]
+            else:
+                # The LLM doesn't report usage, or another task used it meanwhile: estimate (~4 characters per token)
+                prompt_chars = len(task.description) + len(task.expected_output) + len(context or "")
+                span['prompt_tokens'] += prompt_chars // 4
+                span['completion_tokens'] += len(output_text(output)) // 4
+                span['tokens_estimated'] = True
+        return output
+
+    @staticmethod
+    def token_usage(llm):
+        """Return the (prompt, completion) tokens an LLM has used so far, or None if it doesn't track them."""
+        get_summary = getattr(llm, 'get_token_usage_summary', None)
+        if get_summary is None:
+            return None
+        try:
+            usage = get_summary()
+        except Exception:
+            return None
+        return usage.prompt_tokens, usage.completion_tokens
+
+    def execute_traced(self, task, submitted):
+        """Execute a task and record its span in the run trace.
+
+        submitted is the time.monotonic() at which the task was ready to run, so the
+        span's queue time is how long it waited for a free worker.
+        """
+        # Tasks already handed to the pool still check for cancellation before they start
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise RunCancelled(f"Run cancelled before {task.agent.role} started")
+        started = time.monotonic()
+        span = {
+            'task': task_key(task),
+            'agent_role': task.agent.role,
+            'model': self.llm_settings(task)[0],
+            'source': 'model',
+            'status': 'ok',
+            'start_time': time.time(),
+            'queue_seconds': round(started - submitted, 3),
+            'model_calls': 0,
+            'prompt_tokens': 0,
+            'completion_tokens': 0,
+            'tokens_estimated': False,
+        }
+        self.task_spans[span['task']] = span
+        try:
+            return self.execute_task(task)
+        except Exception as e:
+            span['status'] = 'error'
+            span['error'] = str(e)
+            raise
+        finally:
+            span['wall_seconds'] = round(time.monotonic() - started, 3)
+            span['retries'] = max(0, span['model_calls'] - 1)
+            span['cost_usd'] = estimate_cost(span['model'], span['prompt_tokens'], span['completion_tokens'])
+            if self.trace is not None:
+                self.trace.record(span)
+            self.catalog_task(task, span)
+
+    def catalog_run(self, **fields):
+        """Update the current run's catalog entry, if a catalog is set.
+
+        Catalog errors are reported but never fail the run; the movie directory stays
+        the source of truth and can be re-indexed with run_catalog.py.
+        """
+        if self.catalog is None:
+            return
+        try:
+            self.catalog.record_run(self.manifest['run_id'], movie_dir=self.movie_dir, **fields)
+        except sqlite3.Error as e:
+            print(f"Error updating run catalog: {str(e)}")
+
+    def catalog_task(self, task, span):
+        """Record a finished task, its output file and content hash in the catalog."""
+        if self.catalog is None:
+            return
+        with self._manifest_lock:
+            entry = dict(self.manifest['tasks'].get(span['task'], {}))
+        sha256, size = file_digest(os.path.join(self.movie_dir, entry['file'])) if entry.get('file') else (None, None)
+        try:
+            self.catalog.record_task(
+                self.manifest['run_id'], span['task'],
+                agent_role=span['agent_role'],
+                status='done' if span['status'] == 'ok' else span['status'],
+                file=entry.get('file'), sha256=sha256, bytes=size, fingerprint=entry.get('fingerprint'),
+                completed_at=entry.get('completed_at'),
+                **{key: span.get(key) for key in ('source', 'wall_seconds', 'queue_seconds', 'model_calls',
+                                                  'retries', 'prompt_tokens', 'completion_tokens', 'cost_usd')}
+            )
+        except sqlite3.Error as e:
+            print(f"Error updating run catalog: {str(e)}")
+
+    def execute_task(self, task):
+        """Execute a single task with the outputs of its dependencies as context."""
+        previous = self.previous_outputs.get(task_key(task))
+        if previous is not None and previous[0] == self.input_fingerprint(task):
+            # Incremental run: inputs are unchanged since the output on disk was produced
+            try:
+                task.output = self.restore_output(task, previous[1])
+            except ValueError:
+                task.output = None
+            if task.output is not None and self.validate_output(task, task.output)[0]:
+                print(f"Reusing unchanged output of {task.agent.role}")
+                self.task_spans.get(task_key(task), {})['source'] = 'previous'
+                if task.callback:
+                    task.callback(task.output)
+                return task.output
+
+        context = self.task_context(task)
+        if self.cache is None:
+            return self.call_model_with_repairs(task, context)[0]
+
+        key = self.cache_key(task, context)
+        cached = self.cache.get(key)
+        if cached is not None:
+            try:
+                task.output = self.restore_output(task, cached)
+            except ValueError:
+                # Entry doesn't match the task's output model (e.g. recorded before it had one)
+                task.output = None
+            if task.output is not None and self.validate_output(task, task.output)[0]:
+                self.task_spans.get(task_key(task), {})['source'] = 'cache'
+                # execute_sync runs the callback itself; do the same for cached responses
+                if task.callback:
+                    task.callback(task.output)
+                return task.output
+
+        output, is_valid = self.call_model_with_repairs(task, context)
+        # Don't cache an answer that still fails validation, so the next run asks again
+        if is_valid:
+            self.cache.put(key, output_text(output), metadata={'agent_role': task.agent.role})
+        return output
+
+    def call_model_with_repairs(self, task, context):
+        """Execute a task, re-asking the agent with the validator's error while its output fails.
+
+        Only this task is retried; the upstream outputs in its context are reused as is.
+        The task's callback runs once, on the final output. Retries and time spent are
+        recorded in the manifest under 'repairs'.
+
+        Returns:
+            Tuple (output, is_valid)
+        """
+        callback, task.callback = task.callback, None
+        started = time.monotonic()
+        retries = 0
+        try:
+            output, is_valid, message = self.call_model_validated(task, context)
+            first_seconds = time.monotonic() - started
+            while not is_valid and retries < self.max_repairs:
+                retries += 1
+                print(f"Output of {task.agent.role} failed validation: {message} "
+                      f"(retry {retries} of {self.max_repairs})")
+                output, is_valid, message = self.call_model_validated(
+                    task, self.repair_context(context, output, message))
+        finally:
+            task.callback = callback
+
+        if not is_valid:
+            print(f"Warning: output of {task.agent.role} still fails validation: {message}")
+        if role_key(task.agent.role) in self.validators:
+            seconds = time.monotonic() - started
+            with self._manifest_lock:
+                self.manifest.setdefault('repairs', {})[task_key(task)] = {
+                    'agent_role': task.agent.role,
+                    'retries': retries,
+                    'seconds': round(seconds, 2),
+                    'repair_seconds': round(seconds - first_seconds, 2),
+                    'valid': is_valid,
+                    'error': None if is_valid else message,
+                }
+        if output is None:
+            raise ConverterError(f"Output of {task.agent.role} still can't be converted after "
+                                 f"{retries} retries: {message}")
+        if callback:
+            callback(output)
+        return output, is_valid
+
+    def call_model_validated(self, task, context):
+        """Execute a task and validate its output.
+
+        Depending on the crewai version, an answer that doesn't parse into the task's
+        output model either raises ConverterError or comes back without .pydantic; both
+        count as a failed validation, so the answer is re-asked like any other.
+
+        Returns:
+            Tuple (output, is_valid, message); output is None if the answer couldn't be converted
+        """
+        try:
+            output = self.call_model(task, context)
+        except ConverterError as e:
+            return None, False, f"The answer does not match the required output format: {str(e)}"
+        is_valid, message = self.validate_output(task, output)
+        return output, is_valid, message
+
+    @staticmethod
+    def repair_context(context, output, message):
+        """Context for re-asking a task: the original context plus the rejected answer and why."""
+        repair = (f"{context}\n\n----------\n\n"
+                  f"Your previous answer was rejected: {message}\n"
+                  f"Fix this problem and give your complete answer again.")
+        if output is None:
+            return repair
+        return f"{repair}\n\nPrevious answer:\n{output_text(output)}"
+
+    def validate_output(self, task, output):
+        """
+        Check a task output with the validator registered for its task, if any
+        Returns tuple (is_valid, message)
+        """
+        validator = self.validators.get(role_key(task.agent.role))
+        if validator is None:
+            return True, "No validator for this task"
+        if task.output_pydantic is not None and output.pydantic is None:
+            return False, "The answer does not match the required output format"
+        script = output.pydantic if isinstance(output.pydantic, Script) else None
+        for dep in task.context if isinstance(task.context, list) else []:
+            if dep.output is not None and isinstance(dep.output.pydantic, Script):
+                script = dep.output.pydantic
+        if script is None:
+            return True, "No structured script to validate against"
+        return validator(output.pydantic, script)
+
+    def validate_script(self, script, _script):
+        """Check the script's cast: at most 2 characters and exactly one known character per scene."""
+        names = {character.name.strip().lower() for character in script.characters}
+        if not script.scenes:
+            return False, "The script has no scenes"
+        if self.clip_files and len(script.scenes) != len(self.clip_files):
+            return False, (f"The script must have exactly {len(self.clip_files)} scenes, one per scene clip, "
+                           f"got {len(script.scenes)}")
+        if len(names) > 2:
+            return False, f"The script has {len(names)} characters, the maximum is 2"
+        numbers = [scene.number for scene in script.scenes]
+        if sorted(numbers) != list(range(1, len(numbers) + 1)):
+            return False, (f"Scenes must be numbered 1 to {len(numbers)} without gaps or repeats, "
+                           f"got {', '.join(map(str, numbers))}")
+        for scene in script.scenes:
+            if scene.character.strip().lower() not in names:
+                return False, (f"Scene {scene.number} must feature exactly one of the listed characters "
+                               f"({', '.join(c.name for c in script.characters)}), got '{scene.character}'")
+        return True, "Script is valid"
+
+    def validate_scene_prompts(self, prompts, script):
+        """Check there is one prompt per scene, showing only that scene's character."""
+        if len(prompts.prompts) != len(script.scenes):
+            return False, f"Expected one prompt for each of the {len(script.scenes)} scenes, got {len(prompts.prompts)}"
+        by_scene = {prompt.scene: prompt for prompt in prompts.prompts}
+        expected = sorted(scene.number for scene in script.scenes)
+        if len(by_scene) != len(prompts.prompts) or sorted(by_scene) != expected:
+            return False, (f"Expected one prompt for each of scenes {', '.join(map(str, expected))}, "
+                           f"got scenes {', '.join(str(prompt.scene) for prompt in prompts.prompts)}")
+        for scene in script.scenes:
+            prompt = by_scene[scene.number]
+            characters = [name.strip().lower() for name in prompt.characters]
+            if characters != [scene.character.strip().lower()]:
+                return False, (f"Scene {scene.number} must show exactly one character, {scene.character}, "
+                               f"but the prompt lists: {', '.join(prompt.characters) or 'none'}")
+        return True, "Scene prompts are valid"
+
+    def validate_narration(self, narration, script):
+        """Check there is one short narration text per scene and that it yields a valid SRT."""
+        if len(narration.cues) != len(script.scenes):
+            return False, f"Expected narration for each of the {len(script.scenes)} scenes, got {len(narration.cues)}"
+        # Subtitles are timed by scene number, so every scene needs exactly one cue
+        numbers = sorted(cue.scene for cue in narration.cues)
+        expected = list(range(1, len(script.scenes) + 1))
+        if numbers != expected or numbers != sorted(scene.number for scene in script.scenes):
+            return False, (f"Expected one narration cue for each of scenes {', '.join(map(str, expected))}, "
+                           f"got scenes {', '.join(map(str, numbers))}")
+        durations = self.scene_durations()
+        if durations is not None and len(durations) != len(narration.cues):
+            return False, f"Expected narration for each of the {len(durations)} scene clips, got {len(narration.cues)}"
+        durations = durations or [self.scene_duration] * len(narration.cues)
+        for cue in narration.cues:
+            duration = durations[cue.scene - 1]
+            max_words = int(duration * NARRATION_WORDS_PER_SECOND)
+            words = len(cue.text.split())
+            if words == 0:
+                return False, f"The narration of scene {cue.scene} is empty"
+            if words > max_words:
+                return False, (f"The narration of scene {cue.scene} has {words} words, too long to read "
+                               f"within {duration:g} seconds (max {max_words})")
+        return validate_srt(narration.to_srt(durations))
+
+    def restore_output(self, task, raw):
+        """Build a task output from a previously produced response.
+
+        For tasks with an output model, raw must be the output's JSON; a ValueError
+        is raised if it doesn't validate.
+        """
+        pydantic_output = None
+        if task.output_pydantic is not None:
+            pydantic_output = task.output_pydantic.model_validate_json(raw)
+        return TaskOutput(
+            description=task.description,
+            expected_output=task.expected_output,
+            raw=raw,
+            pydantic=pydantic_output,
+            agent=task.agent.role,
+            output_format=OutputFormat.PYDANTIC if pydantic_output is not None else OutputFormat.RAW,
+        )
+
+    def read_saved_output(self, movie_dir, filename):
+        """Read a saved task output, preferring the JSON of a structured output over its rendering."""
+        json_path = os.path.join(movie_dir, os.path.splitext(filename)[0] + '.json')
+        path = json_path if os.path.exists(json_path) else os.path.join(movie_dir, filename)
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+
+    def execute_task_graph(self, tasks, max_concurrency=None, completed=()):
+        """Execute tasks concurrently, starting each one as soon as its context tasks are done.
+
+        Dependencies are taken from each task's `context` list, so a task only waits for
+        the tasks it actually reads from. At most `max_concurrency` tasks run at once
+        (defaults to the generator's setting). Tasks in `completed` already have their
+        output and are not executed again.
+
+        Returns:
+            The output of the last task, mirroring what Crew.kickoff() returns
+        """
+        positions = {id(task): i for i, task in enumerate(tasks)}
+        dependencies = []
+        for task in tasks:
+            context = task.context if isinstance(task.context, list) else []
+            missing = [dep for dep in context if id(dep) not in positions]
+            if missing:
+                raise ValueError(f"Task for '{task.agent.role}' depends on a task that is not being executed")
+            dependencies.append({positions[id(dep)] for dep in context})
+
+        done = {positions[id(task)] for task in completed}
+        running = {}
+        with ThreadPoolExecutor(max_workers=max_concurrency or self.max_concurrency) as pool:
+            while len(done) < len(tasks):
+                # On cancellation, let the running tasks finish but start no new ones
+                cancelled = self.cancel_event is not None and self.cancel_event.is_set()
+                if not cancelled:
+                    for i, task in enumerate(tasks):
+                        if i not in done and i not in running.values() and dependencies[i] <= done:
+                            running[pool.submit(self.execute_traced, task, time.monotonic())] = i
+                if not running:
+                    if cancelled:
+                        raise RunCancelled(f"Run cancelled after {len(done)} of {len(tasks)} tasks")
+                    raise ValueError("Task dependencies contain a cycle")
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    i = running.pop(future)
+                    # Re-raise the task's exception, if any; pending work is still drained
+                    future.result()
+                    done.add(i)
+
+        return tasks[-1].output
+
+    def create_style_tasks(self, scene_task, presets):
+        """Create one scene prompt task per style preset, based on the regular scene prompt task.
+
+        Each task gets its own copy of the scene designer, since an agent must not
+        execute two tasks at once.
+        """
+        style_tasks = []
+        for preset in presets:
+            style_tasks.append(Task(
+                name=f"scenes_{slugify(preset['name'])}",
+                description=scene_task.description + dedent(f"""
+
+                    Visual style: {preset['name']}
+                    """) + preset['prompt'],
+                agent=scene_task.agent.copy(),
+                context=scene_task.context,
+                output_pydantic=scene_task.output_pydantic,
+                expected_output=scene_task.expected_output
+            ))
+        return style_tasks
+
+    def save_styles(self, result_saver, presets, styles_file=STYLE_PRESETS_FILE):
+        """Record the styles of this run and their presets file in the manifest, and their video settings in styles.json."""
+        styles = {
+            slugify(preset['name']): {
+                'name': preset['name'],
+                'scenes_file': f"scenes_{slugify(preset['name'])}.txt",
+                'model': preset.get('model'),
+                'modelInput': preset.get('modelInput', {}),
+            }
+            for preset in presets
+        }
+        atomic_write(os.path.join(self.movie_dir, STYLES_FILENAME), json.dumps(styles, indent=2))
+        with self._manifest_lock:
+            self.manifest['styles'] = [preset['name'] for preset in presets]
+            self.manifest['styles_file'] = os.path.abspath(styles_file)
+            result_saver.save_manifest(self.manifest)
+
+    def start_movie_dir(self, result_saver, brief=None, movie_id=None):
+        """Create the directory and manifest for a new movie before any task runs."""
         current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
+        movie_name = f"{current_time}_{movie_id}" if movie_id else current_time
+        os.makedirs("files", exist_ok=True)
+        # Create the directory exclusively: runs started in the same second get a numbered suffix
+        suffix = 1
+        while True:
+            self.movie_dir = os.path.join("files", movie_name if suffix == 1 else f"{movie_name}_{suffix}")
+            try:
+                os.mkdir(self.movie_dir)
+                break
+            except FileExistsError:
+                suffix += 1
+        result_saver.set_movie_dir(self.movie_dir)
+
+        self.manifest = {
+            'run_id': uuid.uuid4().hex,
+            'created': current_time,
+            'brief': brief,
+            'movie_id': movie_id,
+            'status': 'running',
+            'tasks': {},
+        }
+        result_saver.save_manifest(self.manifest)
+
+    def resume_movie_dir(self, result_saver, movie_dir, tasks):
+        """Load a movie directory's manifest and restore the outputs of its completed tasks.
+
+        Returns:
+            The tasks whose outputs were restored
+        """
+        self.movie_dir = movie_dir
+        result_saver.set_movie_dir(movie_dir)
+        self.manifest = result_saver.load_manifest(movie_dir)
+        # A failed or cancelled run is running again
+        self.manifest['status'] = 'running'
+
+        completed = []
+        for task in tasks:
+            entry = self.manifest['tasks'].get(task_key(task))
+            if not entry or entry.get('status') != 'done':
+                continue
+            try:
+                task.output = self.restore_output(task, self.read_saved_output(movie_dir, entry['file']))
+            except (OSError, ValueError):
+                # Missing or unreadable output: run the task again
+                continue
+            completed.append(task)
+        return completed
+
+    def load_previous_outputs(self, result_saver, movie_dir):
+        """Open an existing movie directory for an incremental run.
+
+        Saved outputs are kept with their input fingerprints; execute_task reuses an
+        output only if the task's current fingerprint still matches.
+        """
+        self.movie_dir = movie_dir
+        result_saver.set_movie_dir(movie_dir)
+        self.manifest = result_saver.load_manifest(movie_dir)
+        self.previous_outputs = {}
+        for key, entry in self.manifest['tasks'].items():
+            if entry.get('status') != 'done' or not entry.get('fingerprint'):
+                continue
+            if os.path.exists(os.path.join(movie_dir, entry['file'])):
+                self.previous_outputs[key] = (entry['fingerprint'], self.read_saved_output(movie_dir, entry['file']))
+
+        self.manifest['status'] = 'running'
+        result_saver.save_manifest(self.manifest)
+
+    def checkpoint_callback(self, result_saver, task):
+        """Return a task callback that saves the task's output and records it in the manifest."""
+        def checkpoint(output):
+            filepath = result_saver.save_result(
+                movie_timestamp=self.manifest['created'],
+                agent_role=task.agent.role,
+                content=output,
+                name=task_key(task)
+            )
+            fingerprint = self.input_fingerprint(task)
+            with self._manifest_lock:
+                self.manifest['tasks'][task_key(task)] = {
+                    'status': 'done',
+                    'file': os.path.basename(filepath),
+                    'fingerprint': fingerprint,
+                    'completed_at': datetime.now().isoformat(timespec='seconds'),
+                }
+                result_saver.save_manifest(self.manifest)
+        return checkpoint
+
+    def write_narration_srt(self, narration):
+        """Build narration.srt from the narration cues, timed by scene durations.
+
+        Durations are probed from the scene clips if given, otherwise every scene
+        lasts scene_duration seconds.
+        """
+        durations = self.scene_durations()
+        if durations is None:
+            durations = [self.scene_duration] * len(narration.cues)
+        elif len(durations) != len(narration.cues):
+            print(f"Error: got {len(durations)} clips for {len(narration.cues)} narration cues, "
+                  f"narration.srt not written")
+            return False
+        success, message = save_srt_file(self.movie_dir, narration.to_srt(durations))
+        print(message)
+        return success
+
+    def finish_movie_dir(self, result_saver, movie_title):
+        """Mark the run complete and rename its directory to include the movie title."""
         # Use both timestamp and title in directory name, sanitize the title for filesystem
         safe_title = "".join(c for c in movie_title if c.isalnum() or c in (' ', '-', '_')).strip()
         safe_title = safe_title.replace(' ', '_')
-        movie_name = f"{current_time}_{safe_title}"
-        self.movie_dir = os.path.join("files", movie_name)
-        os.makedirs(self.movie_dir, exist_ok=True)
-        
-        # Set the movie directory in the result saver
-        result_saver.set_movie_dir(self.movie_dir)
+        movie_name = f"{self.manifest['created']}_{safe_title}"
+        if self.manifest.get('movie_id'):
+            movie_name = f"{movie_name}_{self.manifest['movie_id']}"
+        # A movie with the same title from the same second gets a numbered suffix, as in start_movie_dir
+        suffix = 1
+        while True:
+            final_dir = os.path.join(os.path.dirname(self.movie_dir),
+                                     movie_name if suffix == 1 else f"{movie_name}_{suffix}")
+            if os.path.abspath(final_dir) == os.path.abspath(self.movie_dir):
+                # Regenerated in place, already named after the title
+                break
+            if not os.path.exists(final_dir):
+                try:
+                    os.rename(self.movie_dir, final_dir)
+                except OSError:
+                    # Another run took the name in the meantime
+                    if not os.path.exists(final_dir):
+                        raise
+                else:
+                    self.movie_dir = final_dir
+                    result_saver.set_movie_dir(final_dir)
+                    break
+            suffix += 1
+
+        self.manifest['status'] = 'complete'
+        self.manifest['title'] = movie_title
+        result_saver.save_manifest(self.manifest)
+
+    def run(self, brief=None, movie_id=None, resume_dir=None, incremental_dir=None, styles=None, styles_file=None):
+        """Generate one movie.
+
+        Each task's output is saved to the movie directory as soon as the task completes,
+        together with a manifest of completed tasks.
+
+        Args:
+            brief: Optional story brief the script has to follow
+            movie_id: Optional identifier appended to the movie directory name, so
+                concurrent runs with the same title don't share a directory; see check_movie_id
+            resume_dir: Movie directory of an interrupted run; its completed tasks are
+                restored from disk and only the remaining ones are executed
+            incremental_dir: Movie directory of a previous run to regenerate in place; only
+                tasks whose description, agent config or upstream outputs changed (and
+                dependents whose inputs change as a result) are executed again
+            styles: Optional list of style presets (see load_style_presets). The scene
+                prompts are then generated once per style, concurrently, on top of a
+                single run of the style-independent tasks
+            styles_file: Presets file the styles come from. When resuming or regenerating,
+                the run's styles are looked up again in this file, by default the one
+                recorded in the manifest
+        """
+        if movie_id is not None:
+            check_movie_id(movie_id)
+        run_started = time.time()
+        # Create agents (or reuse the ones from a previous run)
+        story_writer, character_designer, scene_designer, music_designer, narrator, title_generator, result_saver = self.get_agents()
         
-        # Save results using ResultSaver agent
+        if resume_dir or incremental_dir:
+            manifest = result_saver.load_manifest(resume_dir or incremental_dir)
+            if resume_dir or brief is None:
+                brief = manifest.get('brief')
+            styles_file = styles_file or manifest.get('styles_file')
+            if styles is None and manifest.get('styles'):
+                styles = select_style_presets(manifest['styles'], styles_file or STYLE_PRESETS_FILE)
+
+        # Create tasks
+        tasks = self.create_tasks(story_writer, character_designer, scene_designer, music_designer, narrator, title_generator, brief=brief)
+        if styles:
+            # Replace the single scene prompt task with one task per style
+            position = next(i for i, task in enumerate(tasks) if task.agent is scene_designer)
+            tasks[position:position + 1] = self.create_style_tasks(tasks[position], styles)
+
+        completed = []
+        self.previous_outputs = {}
+        if resume_dir:
+            completed = self.resume_movie_dir(result_saver, resume_dir, tasks)
+            print(f"Resuming {resume_dir}: {len(completed)} of {len(tasks)} tasks already completed")
+        elif incremental_dir:
+            self.load_previous_outputs(result_saver, incremental_dir)
+            self.manifest['brief'] = brief
+        else:
+            self.start_movie_dir(result_saver, brief=brief, movie_id=movie_id)
+        if styles:
+            self.save_styles(result_saver, styles, styles_file or STYLE_PRESETS_FILE)
+        if 'run_id' not in self.manifest:
+            # Directory created before runs had ids
+            self.manifest['run_id'] = uuid.uuid4().hex
+            result_saver.save_manifest(self.manifest)
+        self.trace = RunTrace(os.path.join(self.movie_dir, TRACE_FILENAME), self.otel_exporter,
+                              run_id=self.manifest['run_id'])
+        self.task_spans = {}
+        self.catalog_run(
+            created=created_iso(self.manifest['created']), brief=brief, movie_id=self.manifest.get('movie_id'),
+            model=getattr(self.llm, 'model', None) or self.openai_model_name,
+            styles=self.manifest.get('styles') or [], status='running', error=None, started_at=run_started,
+        )
+
+        # Save every task's output as soon as it completes
         for task in tasks:
-            if task.output is not None:  # Only save if there's output
-                result_saver.save_result(
-                    movie_timestamp=current_time,
-                    agent_role=task.agent.role,
-                    content=task.output
-                )
+            task.callback = self.checkpoint_callback(result_saver, task)
         
+        # Run the task graph ourselves rather than through Crew.kickoff(), so every task gets
+        # only the script fields it needs, goes through the response cache and rate limiter,
+        # and completed or unchanged tasks are skipped. Without --parallel (or styles to
+        # fan out), one worker keeps execution sequential
+        concurrent = self.parallel or bool(styles)
+        status, error, movie_title = 'failed', None, None
+        try:
+            result = self.execute_task_graph(tasks, max_concurrency=None if concurrent else 1,
+                                             completed=completed)
+
+            # Subtitles are assembled locally from the narration text, so timing is always valid
+            narration_task = next((task for task in tasks if task.agent is narrator), None)
+            if narration_task is not None and narration_task.output is not None and narration_task.output.pydantic:
+                if not self.write_narration_srt(narration_task.output.pydantic):
+                    raise RuntimeError("narration.srt could not be written")
+
+            # Get the generated title from the title task
+            title_task = tasks[-1]  # Last task is the title generation task
+            movie_title = str(title_task.output).strip() if title_task.output else "Untitled"
+            self.finish_movie_dir(result_saver, movie_title)
+            status = 'complete'
+        except RunCancelled as e:
+            # Completed tasks stay checkpointed, so the run can be continued with --resume
+            status, error = 'cancelled', str(e)
+            raise
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            finished = time.time()
+            summary = self.trace.finish(run_started, finished, {'filmcrew.title': movie_title,
+                                                                'filmcrew.status': status}, error=error)
+            if self.otel_exporter is not None:
+                self.otel_exporter.close()
+            if status != 'complete':
+                with self._manifest_lock:
+                    self.manifest['status'] = status
+                    result_saver.save_manifest(self.manifest)
+            fields = {'title': movie_title} if movie_title is not None else {}
+            self.catalog_run(status=status, error=error, finished_at=finished,
+                             seconds=round(finished - run_started, 2), **fields)
+
+        print("\nTask timings:")
+        print(format_summary(summary))
+        
+        repairs = self.manifest.get('repairs', {})
+        if any(entry['retries'] for entry in repairs.values()):
+            print("Validation retries:")
+            for name, entry in sorted(repairs.items()):
+                if not entry['retries'] and entry['valid']:
+                    continue
+                print(f"  {name}: {entry['retries']} retries, {entry['repair_seconds']}s spent on repairs"
+                      f"{'' if entry['valid'] else ' (still invalid)'}")
+
+        if self.cache is not None:
+            stats = self.cache.stats()
+            print(f"Response cache: {stats['hits']} hits, {stats['misses']} misses, "
+                  f"{stats['entries']} entries ({stats['bytes']} bytes)")
+
         return result
 
+def check_clip_arguments(parser, clips):
+    """Reject --clips that are missing or can't be probed (via parser.error) before any model call."""
+    missing = [clip for clip in clips if not os.path.isfile(clip)]
+    if missing:
+        parser.error(f"--clips: no such file: {', '.join(missing)}")
+    from join_videos import probe_durations
+    try:
+        probe_durations(clips)
+    except (OSError, ValueError, KeyError, subprocess.CalledProcessError) as e:
+        parser.error(f"--clips: can't read the clip durations: {str(e)}")
+
+def positive_int(value):
+    """argparse type for options that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+def positive_float(value):
+    """argparse type for options that must be greater than 0."""
+    number = float(value)
+    if not number > 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {value}")
+    return number
+
+def add_generator_arguments(parser):
+    """Add the options shared by every entry point that drives a MovieScriptGenerator."""
+    parser.add_argument('--parallel', action='store_true',
+                        help="Run tasks that only depend on the script concurrently")
+    parser.add_argument('--max-concurrency', type=positive_int, default=4,
+                        help="Maximum number of tasks running at once in parallel mode (default: 4)")
+    parser.add_argument('--scene-duration', type=positive_float, default=5.0,
+                        help="Length of each scene in seconds, used to time the subtitles (default: 5)")
+    parser.add_argument('--max-repairs', type=int, default=2,
+                        help="Times a task is re-asked when its output fails validation (default: 2)")
+    parser.add_argument('--catalog', default=DEFAULT_CATALOG,
+                        help=f"SQLite catalog recording every run (default: {DEFAULT_CATALOG})")
+    parser.add_argument('--no-catalog', action='store_true', help="Don't record runs in the catalog")
+    parser.add_argument('--cache', action='store_true',
+                        help="Reuse cached responses for identical tasks; without it every run calls the model "
+                             "and gets a new movie")
+    parser.add_argument('--cache-dir', default=os.getenv('FILMCREW_CACHE_DIR', '.cache/responses'),
+                        help="Directory of the on-disk response cache (default: .cache/responses)")
+    parser.add_argument('--cache-max-entries', type=int, default=1000,
+                        help="Evict least recently used responses beyond this many entries")
+    parser.add_argument('--cache-max-age-days', type=float, default=30,
+                        help="Evict responses older than this many days")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate a short movie script and prompts with an AI crew")
+    parser.add_argument('--brief', help="Story brief the script has to follow")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--resume', metavar='MOVIE_DIR',
+                      help="Resume an interrupted run, skipping tasks already saved in MOVIE_DIR")
+    mode.add_argument('--incremental', metavar='MOVIE_DIR',
+                      help="Regenerate MOVIE_DIR in place, re-running only tasks whose inputs changed")
+    add_generator_arguments(parser)
+    parser.add_argument('--clips', nargs='+', metavar='CLIP',
+                        help="Scene clips, in order; subtitles are timed to their actual lengths")
+    parser.add_argument('--otel-file', metavar='PATH',
+                        help="Also export the task spans as OpenTelemetry JSON lines to PATH "
+                             "(requires opentelemetry-sdk)")
+    parser.add_argument('--styles',
+                        help="Comma-separated style presets from video-style-options.json (or 'all'); "
+                             "scene prompts are generated once per style in parallel")
+    parser.add_argument('--styles-file',
+                        help="Style presets file (default: video-style-options.json, or the file a resumed "
+                             "run was started with)")
+    parser.add_argument('--images', action='store_true',
+                        help="Generate character and scene images from the prompts after the run")
+    add_image_arguments(parser)
+    parser.add_argument('--assemble', action='store_true',
+                        help="Render --clips, narration.srt and music into final.mp4 in the movie directory "
+                             "after the run")
+    add_assemble_arguments(parser)
+    args = parser.parse_args()
+    if args.clips:
+        check_clip_arguments(parser, args.clips)
+    if args.images:
+        check_image_arguments(parser, args)
+    if args.assemble:
+        if not args.clips:
+            parser.error("--assemble needs the scene clips, pass them with --clips")
+        check_assemble_arguments(parser)
+    return args
+
+def build_cache(args):
+    if not args.cache:
+        return None
+    return ResponseCache(
+        directory=args.cache_dir,
+        max_entries=args.cache_max_entries,
+        max_age_seconds=args.cache_max_age_days * 24 * 3600,
+    )
+
+def build_catalog(args):
+    if args.no_catalog:
+        return None
+    return RunCatalog(args.catalog)
+
 if __name__ == "__main__":
-    generator = MovieScriptGenerator()
-    result = generator.run()
+    args = parse_args()
+    generator = MovieScriptGenerator(
+        parallel=args.parallel,
+        max_concurrency=args.max_concurrency,
+        cache=build_cache(args),
+        scene_duration=args.scene_duration,
+        clip_files=args.clips,
+        max_repairs=args.max_repairs,
+        otel_file=args.otel_file,
+        catalog=build_catalog(args),
+    )
+    styles = None
+    if args.styles:
+        try:
+            styles = select_style_presets([name.strip() for name in args.styles.split(',')],
+                                          args.styles_file or STYLE_PRESETS_FILE)
+        except (OSError, ValueError) as e:
+            print(f"Error loading style presets: {str(e)}")
+            sys.exit(1)
+    result = generator.run(brief=args.brief, resume_dir=args.resume, incremental_dir=args.incremental,
+                           styles=styles, styles_file=args.styles_file)
     print(result)
+    if args.images:
+        try:
+            generate_images(generator.movie_dir, args)
+        except (OSError, ValueError) as e:
+            print(f"Error while generating images: {str(e)}")
+            sys.exit(1)
+    if args.assemble:
+        try:
+            assemble_movie(generator.movie_dir, clips=args.clips, music=args.music, **assemble_options(args))
+        except (OSError, ValueError, RuntimeError) as e:
+            print(f"Error while assembling the movie: {str(e)}")
+            sys.exit(1)
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Turn the character and scene prompts of a generated movie into images.
+
+Prompts are read from characters.txt and scenes.txt in a movie directory,
+submitted concurrently through a pooled HTTP session, and the resulting images
+are streamed into <movie_dir>/images/. Each image is named after a hash of its
+prompt and backend, so rerunning the stage only generates what is missing.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+PROMPT_FILES = {'character': 'characters.txt', 'scene': 'scenes.txt'}
+IMAGES_DIRNAME = 'images'
+RETRY_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+# Lines like "Scene 1:", "**Character 2 - Mia**" or "1." that only label the prompt after them
+HEADING_PATTERN = re.compile(r'^[#*\s]*((scene|character|prompt)\b[^:]*|\d+[.)])[:*\s]*$', re.IGNORECASE)
+# Numbering or bullets in front of a prompt
+PREFIX_PATTERN = re.compile(r'^\s*(?:[-*]\s+|\d+[.)]\s+)')
+
+
+class RetryableError(Exception):
+    """A backend failure worth retrying (rate limits, server errors, dropped connections)."""
+
+
+def parse_prompts(text):
+    """Split a designer agent's output into individual image prompts.
+
+    Prompts are separated by blank lines, headings or new list items; heading
+    lines that only label the next prompt are dropped, as are numbering, bullet
+    prefixes and markdown emphasis.
+    """
+    prompts = []
+    current = []
+    for line in text.splitlines() + ['']:
+        stripped = line.strip().replace('**', '').lstrip('#').strip()
+        if not stripped or HEADING_PATTERN.match(stripped) or PREFIX_PATTERN.match(stripped):
+            if current:
+                prompts.append(' '.join(current))
+                current = []
+        if not stripped or HEADING_PATTERN.match(stripped):
+            continue
+        current.append(PREFIX_PATTERN.sub('', stripped).strip())
+    return [prompt for prompt in prompts if prompt]
+
+
+def read_prompts(path):
+    """Read the prompts of a designer task output.
+
+    Structured outputs saved next to the text file (characters.json, scenes.json)
+    are used directly; otherwise the text is parsed with parse_prompts.
+    """
+    json_path = os.path.splitext(path)[0] + '.json'
+    if os.path.exists(json_path):
+        with open(json_path, encoding="utf-8") as f:
+            return [item['prompt'] for item in json.load(f)['prompts']]
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return parse_prompts(f.read())
+
+
+class ImageBackend(ABC):
+    """Interface for image generation services.
+
+    generate() returns either a URL to download the image from or the image bytes.
+    Implementations raise RetryableError for failures worth retrying.
+    """
+    name = 'backend'
+
+    @abstractmethod
+    def generate(self, session, prompt):
+        """Generate one image for a prompt."""
+
+    def cache_identity(self):
+        """Settings that change the generated image, included in the cache key."""
+        return {'backend': self.name}
+
+    @staticmethod
+    def check_response(response):
+        if response.status_code in RETRY_STATUS_CODES:
+            raise RetryableError(f"HTTP {response.status_code}: {response.text[:200]}")
+        response.raise_for_status()
+
+
+class OpenAIImageBackend(ImageBackend):
+    """OpenAI images API (DALL-E)."""
+    name = 'openai'
+
+    def __init__(self, api_key=None, model='dall-e-3', size='1024x1024',
+                 endpoint='https://api.openai.com/v1/images/generations', timeout=120):
+        self.api_key = api_key or os.getenv('OPENAI_API_KEY')
+        self.model = model
+        self.size = size
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def cache_identity(self):
+        return {'backend': self.name, 'model': self.model, 'size': self.size}
+
+    def generate(self, session, prompt):
+        response = session.post(
+            self.endpoint,
+            headers={'Authorization': f"Bearer {self.api_key}"},
+            json={'model': self.model, 'prompt': prompt, 'size': self.size, 'n': 1},
+            timeout=self.timeout,
+        )
+        self.check_response(response)
+        return response.json()['data'][0]['url']
+
+
+class HttpImageBackend(ImageBackend):
+    """Generic JSON endpoint: POST {"prompt": ...}, answered with image bytes or {"url": ...}.
+
+    Useful for self-hosted models and for testing against a local stub server.
+    """
+    name = 'http'
+
+    def __init__(self, endpoint, timeout=120, extra_params=None):
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.extra_params = extra_params or {}
+
+    def cache_identity(self):
+        return {'backend': self.name, 'endpoint': self.endpoint, 'params': self.extra_params}
+
+    def generate(self, session, prompt):
+        response = session.post(self.endpoint, json={'prompt': prompt, **self.extra_params},
+                                timeout=self.timeout)
+        self.check_response(response)
+        if response.headers.get('Content-Type', '').startswith('application/json'):
+            return response.json()['url']
+        return response.content
+
+
+class ImageGenerator:
+    def __init__(self, backend, concurrency=4, max_retries=4, backoff=1.0, max_backoff=30.0):
+        self.backend = backend
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        # One session shared by all workers, with a connection pool sized to match
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def prompt_hash(self, prompt):
+        payload = json.dumps({'prompt': prompt, **self.backend.cache_identity()}, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+    def with_retries(self, func, *args):
+        """Call func, retrying RetryableError and connection errors with exponential backoff and full jitter."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return func(*args)
+            except (RetryableError, requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+                print(f"Retrying in {delay:.1f}s after error: {str(e)}")
+                time.sleep(delay)
+
+    def download(self, url, filepath):
+        """Stream an image to disk in chunks, replacing the target only once it is complete."""
+        tmp_path = f"{filepath}.part"
+        with self.session.get(url, stream=True, timeout=120) as response:
+            ImageBackend.check_response(response)
+            with open(tmp_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    f.write(chunk)
+        os.replace(tmp_path, filepath)
+
+    def generate_one(self, prompt, filepath):
+        if os.path.exists(filepath):
+            return 'cached'
+        result = self.with_retries(self.backend.generate, self.session, prompt)
+        if isinstance(result, bytes):
+            tmp_path = f"{filepath}.part"
+            with open(tmp_path, 'wb') as f:
+                f.write(result)
+            os.replace(tmp_path, filepath)
+        else:
+            self.with_retries(self.download, result, filepath)
+        return 'generated'
+
+    def generate_for_movie(self, movie_dir):
+        """Generate images for every character and scene prompt of a movie directory.
+
+        Returns:
+            List of dicts (kind, index, prompt, file, status), also written to images/images.json
+        """
+        images_dir = os.path.join(movie_dir, IMAGES_DIRNAME)
+        os.makedirs(images_dir, exist_ok=True)
+
+        prompt_files = list(PROMPT_FILES.items())
+        # Per-style scene prompts from a styled run (scenes_<style>.txt)
+        for filename in sorted(os.listdir(movie_dir)):
+            if filename.startswith('scenes_') and filename.endswith('.txt'):
+                prompt_files.append((f"scene_{filename[len('scenes_'):-len('.txt')]}", filename))
+
+        assets = []
+        for kind, filename in prompt_files:
+            for index, prompt in enumerate(read_prompts(os.path.join(movie_dir, filename)), 1):
+                name = f"{kind}_{index}_{self.prompt_hash(prompt)}.png"
+                assets.append({'kind': kind, 'index': index, 'prompt': prompt, 'file': name})
+
+        def run(asset):
+            try:
+                asset['status'] = self.generate_one(asset['prompt'], os.path.join(images_dir, asset['file']))
+            except Exception as e:
+                asset['status'] = 'failed'
+                asset['error'] = str(e)
+            print(f"[{asset['status']}] {asset['kind']} {asset['index']}")
+            return asset
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            results = list(pool.map(run, assets))
+
+        with open(os.path.join(images_dir, 'images.json'), 'w', encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        return results
+
+
+def build_backend(name, endpoint=None):
+    if name == 'openai':
+        return OpenAIImageBackend()
+    if name == 'http':
+        if not endpoint:
+            raise ValueError("The http backend needs an endpoint")
+        return HttpImageBackend(endpoint)
+    raise ValueError(f"Unknown image backend '{name}'")
+
+
+def add_image_arguments(parser):
+    """Add the image generation options shared by this script and filmcrew.py."""
+    parser.add_argument('--image-backend', choices=('openai', 'http'), default='openai',
+                        help="Image generation service (default: openai)")
+    parser.add_argument('--image-endpoint', help="Endpoint URL for the http backend")
+    parser.add_argument('--image-concurrency', type=int, default=4,
+                        help="Number of images generated at once (default: 4)")
+    parser.add_argument('--image-retries', type=int, default=4,
+                        help="Retries per image on rate limits and server errors (default: 4)")
+
+
+def check_image_arguments(parser, args):
+    """Reject invalid image options at startup (via parser.error) rather than after the crew has run."""
+    if args.image_backend == 'http' and not args.image_endpoint:
+        parser.error("--image-backend http needs --image-endpoint")
+    if args.image_concurrency < 1:
+        parser.error("--image-concurrency must be at least 1")
+    if args.image_retries < 0:
+        parser.error("--image-retries can't be negative")
+
+
+def generate_images(movie_dir, args):
+    generator = ImageGenerator(
+        build_backend(args.image_backend, args.image_endpoint),
+        concurrency=args.image_concurrency,
+        max_retries=args.image_retries,
+    )
+    results = generator.generate_for_movie(movie_dir)
+    failed = [r for r in results if r['status'] == 'failed']
+    print(f"Images: {len(results) - len(failed)} of {len(results)} ready in {os.path.join(movie_dir, IMAGES_DIRNAME)}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate character and scene images for a movie directory")
+    parser.add_argument('movie_dir', help="Movie directory containing characters.txt and scenes.txt")
+    add_image_arguments(parser)
+    args = parser.parse_args()
+    check_image_arguments(parser, args)
+    try:
+        results = generate_images(args.movie_dir, args)
+    except ValueError as e:
+        print(f"Error: {str(e)}")
+        sys.exit(1)
+    if any(r['status'] == 'failed' for r in results):
+        sys.exit(1)
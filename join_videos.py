@@ -1,40 +1,245 @@
 #!/usr/bin/env python3
 
+import os
 import sys
+import json
+import wave
+import shutil
+import argparse
+import tempfile
+import subprocess
+import numpy as np
 from moviepy.editor import VideoFileClip, concatenate_videoclips
+from moviepy.video.io.ffmpeg_writer import FFMPEG_VideoWriter
 from datetime import datetime
 
-def join_videos(video_files):
+# Stream parameters that must be identical for a concat-demuxer stream copy to be valid
+VIDEO_PARAMS = ('codec_name', 'profile', 'width', 'height', 'pix_fmt', 'r_frame_rate', 'time_base')
+AUDIO_PARAMS = ('codec_name', 'sample_rate', 'channels', 'time_base')
+
+# In auto mode, re-encode clip by clip instead of opening every clip at once above this count
+MAX_OPEN_CLIPS = 16
+AUDIO_FPS = 44100
+
+def find_ffmpeg():
+    """Return the ffmpeg executable, preferring the one on PATH over moviepy's bundled copy."""
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg:
+        return ffmpeg
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return None
+
+def probe_video(path):
+    """Read the stream parameters of a video file with ffprobe."""
+    output = subprocess.run(
+        ['ffprobe', '-v', 'error', '-show_streams', '-of', 'json', path],
+        capture_output=True, text=True, check=True
+    ).stdout
+    streams = json.loads(output).get('streams', [])
+    video = [s for s in streams if s.get('codec_type') == 'video']
+    audio = [s for s in streams if s.get('codec_type') == 'audio']
+    return {
+        'video': [{param: s.get(param) for param in VIDEO_PARAMS} for s in video],
+        'audio': [{param: s.get(param) for param in AUDIO_PARAMS} for s in audio],
+    }
+
+def probe_durations(video_files):
+    """Return the duration of each clip in seconds, via ffprobe or moviepy if ffprobe is missing."""
+    durations = []
+    for file in video_files:
+        if shutil.which('ffprobe'):
+            output = subprocess.run(
+                ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'json', file],
+                capture_output=True, text=True, check=True
+            ).stdout
+            durations.append(float(json.loads(output)['format']['duration']))
+        else:
+            clip = VideoFileClip(file, audio=False)
+            durations.append(clip.duration)
+            clip.close()
+    return durations
+
+def can_stream_copy(video_files):
+    """
+    Check whether the clips can be joined without re-encoding
+    Returns tuple (can_copy, reason)
+    """
+    if not shutil.which('ffprobe'):
+        return False, "ffprobe not found"
+    try:
+        probes = [probe_video(file) for file in video_files]
+    except (OSError, subprocess.CalledProcessError, ValueError) as e:
+        return False, f"could not probe clips: {str(e)}"
+
+    reference = probes[0]
+    if not reference['video']:
+        return False, f"no video stream in {video_files[0]}"
+    for file, probe in zip(video_files[1:], probes[1:]):
+        if probe != reference:
+            return False, f"{file} has different stream parameters than {video_files[0]}"
+    return True, "all clips share codec, resolution, frame rate and timebase"
+
+def write_concat_list(video_files, file_list):
+    """Write the clips to an open text file as a concat demuxer list of absolute paths."""
+    for file in video_files:
+        # Escape single quotes for the concat demuxer's quoting rules
+        path = os.path.abspath(file).replace("'", "'\\''")
+        file_list.write(f"file '{path}'\n")
+
+def join_with_stream_copy(video_files, output_name):
+    """Join clips with ffmpeg's concat demuxer, copying the streams without re-encoding."""
+    ffmpeg = find_ffmpeg()
+    if not ffmpeg:
+        raise RuntimeError("ffmpeg not found")
+
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as file_list:
+        write_concat_list(video_files, file_list)
+    try:
+        subprocess.run(
+            [ffmpeg, '-y', '-v', 'error', '-f', 'concat', '-safe', '0', '-i', file_list.name,
+             '-c', 'copy', '-movflags', '+faststart', output_name],
+            check=True
+        )
+    finally:
+        os.remove(file_list.name)
+
+def join_with_moviepy(video_files, output_name):
+    """Join clips by decoding them with moviepy and re-encoding the result."""
+    # Load all video clips
+    clips = [VideoFileClip(file) for file in video_files]
+
+    # Concatenate clips
+    final_clip = concatenate_videoclips(clips)
+
+    # Write the result
+    final_clip.write_videofile(output_name)
+
+    # Close all clips to free up resources
+    for clip in clips:
+        clip.close()
+    final_clip.close()
+
+def write_clip_audio(clip, wav_file, channels=2):
+    """Append a clip's audio (or silence if it has none) to an open 16-bit WAV file."""
+    if clip.audio is None:
+        silence = np.zeros((int(round(clip.duration * AUDIO_FPS)), channels), dtype=np.int16)
+        wav_file.writeframes(silence.tobytes())
+        return
+    for chunk in clip.audio.iter_chunks(chunk_duration=1.0, fps=AUDIO_FPS, quantize=True, nbytes=2):
+        chunk = np.asarray(chunk, dtype=np.int16).reshape(len(chunk), -1)
+        if chunk.shape[1] != channels:
+            chunk = np.repeat(chunk[:, :1], channels, axis=1)
+        wav_file.writeframes(chunk.tobytes())
+
+def join_streaming(video_files, output_name, fps=None):
+    """
+    Join clips through a single encoder while holding at most one clip open.
+    Each clip is opened, its frames are written to the output encoder and
+    its audio to a temporary WAV, and it is closed before the next one is
+    opened, so memory and file descriptors stay constant in the clip count.
+    """
+    ffmpeg = find_ffmpeg()
+    if not ffmpeg:
+        raise RuntimeError("ffmpeg not found")
+    first = VideoFileClip(video_files[0])
+    size = first.size
+    fps = fps or first.fps
+    first.close()
+
+    with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp:
+        audio_path = tmp.name
+    aac_path = audio_path[:-len('.wav')] + '.m4a'
+    try:
+        # Pass 1 over the audio only: cheap, and the encoder needs the audio file up front
+        with wave.open(audio_path, 'wb') as wav_file:
+            wav_file.setnchannels(2)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(AUDIO_FPS)
+            for file in video_files:
+                clip = VideoFileClip(file)
+                try:
+                    write_clip_audio(clip, wav_file)
+                finally:
+                    clip.close()
+        # The writer copies the audio stream as is, and PCM in MP4 won't play in most players
+        subprocess.run([ffmpeg, '-y', '-v', 'error', '-i', audio_path, '-c:a', 'aac', '-b:a', '192k', aac_path],
+                       check=True)
+
+        writer = FFMPEG_VideoWriter(output_name, size, fps, codec='libx264', audiofile=aac_path,
+                                    ffmpeg_params=['-movflags', '+faststart'])
+        try:
+            for file in video_files:
+                clip = VideoFileClip(file, audio=False)
+                try:
+                    if tuple(clip.size) != tuple(size):
+                        clip = clip.resize(newsize=size)
+                    for frame in clip.iter_frames(fps=fps, dtype='uint8'):
+                        writer.write_frame(frame)
+                finally:
+                    clip.close()
+        finally:
+            writer.close()
+    finally:
+        for path in (audio_path, aac_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+def default_output_name():
+    """Generate output name with timestamp"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"joined_video_{timestamp}.mp4"
+
+def join_videos(video_files, mode='auto', output_name=None):
+    """
+    Join video files into one.
+    mode is 'auto' (stream copy when the clips are compatible, otherwise
+    re-encode), 'copy' (always stream copy), 'reencode' (always moviepy,
+    all clips open at once) or 'stream' (re-encode one clip at a time).
+    In auto mode, re-encoding streams clip by clip when there are more than
+    MAX_OPEN_CLIPS inputs.
+    """
     if len(video_files) < 2:
         print("Error: Please provide at least 2 video files as arguments")
         sys.exit(1)
 
     try:
-        # Load all video clips
-        clips = [VideoFileClip(file) for file in video_files]
-        
-        # Concatenate clips
-        final_clip = concatenate_videoclips(clips)
-        
-        # Generate output name with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_name = f"joined_video_{timestamp}.mp4"
-        
-        # Write the result
-        final_clip.write_videofile(output_name)
-        
-        # Close all clips to free up resources
-        for clip in clips:
-            clip.close()
-        final_clip.close()
-        
+        output_name = output_name or default_output_name()
+        output_dir = os.path.dirname(output_name)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        if mode == 'auto':
+            use_copy, reason = can_stream_copy(video_files)
+            print(f"{'Stream copy' if use_copy else 'Re-encoding'}: {reason}")
+            mode = 'copy' if use_copy else 'stream' if len(video_files) > MAX_OPEN_CLIPS else 'reencode'
+
+        if mode == 'copy':
+            join_with_stream_copy(video_files, output_name)
+        elif mode == 'stream':
+            join_streaming(video_files, output_name)
+        else:
+            join_with_moviepy(video_files, output_name)
+
         print(f"Successfully created {output_name}")
-        
+
     except Exception as e:
         print(f"Error while joining videos: {str(e)}")
         sys.exit(1)
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Join video clips into a single video")
+    parser.add_argument('video_files', nargs='*', help="Video files to join, in order")
+    parser.add_argument('--mode', choices=('auto', 'copy', 'reencode', 'stream'), default='auto',
+                        help="'copy' forces a stream copy, 'reencode' forces moviepy, 'stream' re-encodes "
+                             "one clip at a time in bounded memory; 'auto' (default) copies only when all "
+                             "clips share codec parameters")
+    parser.add_argument('-o', '--output',
+                        help="Output file path (default: joined_video_<timestamp>.mp4)")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    # Remove script name from arguments
-    video_files = sys.argv[1:]
-    join_videos(video_files)
+    args = parse_args()
+    join_videos(args.video_files, mode=args.mode, output_name=args.output)
@@ -0,0 +1,169 @@
+"""
+Persistent on-disk cache for agent task responses.
+
+Entries are content-addressed: the key is a hash of everything that determines
+the model's answer (agent role, task description, upstream context, model and
+sampling parameters), so identical reruns can be served without calling the LLM.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+
+
+class ResponseCache:
+    def __init__(self, directory=".cache/responses", max_entries=1000, max_bytes=100 * 1024 * 1024,
+                 max_age_seconds=30 * 24 * 3600):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        # Running footprint, so a put only scans the directory when a limit is crossed.
+        # None until the first put counts the existing entries.
+        self._count = None
+        self._bytes = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(agent_role, description, context, model, sampling_params=None, agent_config=None):
+        """Hash the inputs that determine a task's response into a cache key."""
+        payload = json.dumps({
+            'agent_role': agent_role,
+            'description': description,
+            'context': context or "",
+            'model': model,
+            'sampling_params': sampling_params or {},
+            'agent_config': agent_config or {},
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _expired(self, mtime, now):
+        return self.max_age_seconds is not None and now - mtime > self.max_age_seconds
+
+    def get(self, key):
+        """Return the cached response for a key, or None on a miss."""
+        path = self._path(key)
+        try:
+            stat = os.stat(path)
+            if self._expired(stat.st_mtime, time.time()):
+                os.remove(path)
+                raise FileNotFoundError(path)
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+            # Touch the entry so eviction treats it as recently used
+            os.utime(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return entry['response']
+
+    def put(self, key, response, metadata=None):
+        """Store a response atomically and evict old entries if the cache is over its limits."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {'key': key, 'created': time.time(), 'metadata': metadata or {}, 'response': response}
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding="utf-8") as f:
+            json.dump(entry, f)
+        size = os.path.getsize(tmp_path)
+        try:
+            replaced = os.path.getsize(path)
+        except OSError:
+            replaced = None
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._count is None:
+                over_limit = True
+            else:
+                self._count += 1 if replaced is None else 0
+                self._bytes += size - (replaced or 0)
+                over_limit = self._count > self.max_entries or self._bytes > self.max_bytes
+        if over_limit:
+            self.evict()
+
+    def _entries(self):
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith('.json'):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def evict(self, headroom=0.9):
+        """Remove expired entries, then least recently used ones until within size limits.
+
+        Evicts down to headroom times the limits, so the next few puts don't
+        trigger another full pass.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            now = time.time()
+            # Oldest access first
+            entries = sorted(self._entries())
+            keep = []
+            removed = 0
+            for mtime, size, path in entries:
+                if self._expired(mtime, now):
+                    removed += self._remove(path)
+                else:
+                    keep.append((mtime, size, path))
+
+            total_bytes = sum(size for _, size, _ in keep)
+            if len(keep) > self.max_entries or total_bytes > self.max_bytes:
+                max_entries = int(self.max_entries * headroom)
+                max_bytes = self.max_bytes * headroom
+                while keep and (len(keep) > max_entries or total_bytes > max_bytes):
+                    _, size, path = keep.pop(0)
+                    total_bytes -= size
+                    removed += self._remove(path)
+            self._count = len(keep)
+            self._bytes = total_bytes
+            return removed
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return 1
+        except OSError:
+            return 0
+
+    def clear(self):
+        """Remove every cached entry."""
+        with self._lock:
+            for _, _, path in self._entries():
+                self._remove(path)
+            self._count = 0
+            self._bytes = 0
+
+    def stats(self):
+        """Return hit/miss counters and the current on-disk footprint."""
+        entries = self._entries()
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+        }
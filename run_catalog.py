@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+SQLite catalog of generated movies.
+
+Every run is recorded as it happens: the run itself (directory, brief, title,
+model, styles, status, timings) and each task's output file with its content
+hash, timings, tokens and cost. Each update is one transaction, so the catalog
+never shows half-recorded tasks, and queries are answered from indexes instead
+of walking the files/ directory:
+
+    python run_catalog.py list --status complete --since 2026-10-01
+    python run_catalog.py search heist
+    python run_catalog.py show <run_id or movie_dir>
+    python run_catalog.py export --format csv -o runs.csv
+    python run_catalog.py index files/    # add movies generated before the catalog existed
+"""
+
+import os
+import csv
+import sys
+import json
+import sqlite3
+import hashlib
+import argparse
+import threading
+from datetime import datetime
+
+DEFAULT_CATALOG = os.getenv('FILMCREW_CATALOG', os.path.join('files', 'catalog.sqlite'))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    movie_dir TEXT NOT NULL,
+    created TEXT NOT NULL,
+    title TEXT,
+    brief TEXT,
+    movie_id TEXT,
+    model TEXT,
+    styles TEXT,
+    status TEXT NOT NULL,
+    error TEXT,
+    started_at REAL,
+    finished_at REAL,
+    seconds REAL
+);
+CREATE INDEX IF NOT EXISTS runs_created ON runs (created);
+CREATE INDEX IF NOT EXISTS runs_title ON runs (title COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS runs_status ON runs (status, created);
+CREATE INDEX IF NOT EXISTS runs_model ON runs (model, created);
+CREATE INDEX IF NOT EXISTS runs_movie_dir ON runs (movie_dir);
+
+CREATE TABLE IF NOT EXISTS run_styles (
+    run_id TEXT NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    style TEXT NOT NULL,
+    PRIMARY KEY (run_id, style)
+);
+CREATE INDEX IF NOT EXISTS run_styles_style ON run_styles (style COLLATE NOCASE);
+
+CREATE TABLE IF NOT EXISTS tasks (
+    run_id TEXT NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    task TEXT NOT NULL,
+    agent_role TEXT,
+    status TEXT NOT NULL,
+    file TEXT,
+    sha256 TEXT,
+    bytes INTEGER,
+    fingerprint TEXT,
+    source TEXT,
+    wall_seconds REAL,
+    queue_seconds REAL,
+    model_calls INTEGER,
+    retries INTEGER,
+    prompt_tokens INTEGER,
+    completion_tokens INTEGER,
+    cost_usd REAL,
+    completed_at TEXT,
+    PRIMARY KEY (run_id, task)
+);
+CREATE INDEX IF NOT EXISTS tasks_sha256 ON tasks (sha256);
+"""
+
+# Full-text index over titles and briefs, kept in sync with runs by triggers
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS runs_fts USING fts5 (title, brief, content='runs', content_rowid='rowid');
+CREATE TRIGGER IF NOT EXISTS runs_fts_insert AFTER INSERT ON runs BEGIN
+    INSERT INTO runs_fts (rowid, title, brief) VALUES (new.rowid, new.title, new.brief);
+END;
+CREATE TRIGGER IF NOT EXISTS runs_fts_delete AFTER DELETE ON runs BEGIN
+    INSERT INTO runs_fts (runs_fts, rowid, title, brief) VALUES ('delete', old.rowid, old.title, old.brief);
+END;
+CREATE TRIGGER IF NOT EXISTS runs_fts_update AFTER UPDATE OF title, brief ON runs BEGIN
+    INSERT INTO runs_fts (runs_fts, rowid, title, brief) VALUES ('delete', old.rowid, old.title, old.brief);
+    INSERT INTO runs_fts (rowid, title, brief) VALUES (new.rowid, new.title, new.brief);
+END;
+"""
+
+RUN_COLUMNS = ('run_id', 'movie_dir', 'created', 'title', 'brief', 'movie_id', 'model', 'styles', 'status',
+               'error', 'started_at', 'finished_at', 'seconds')
+TASK_COLUMNS = ('run_id', 'task', 'agent_role', 'status', 'file', 'sha256', 'bytes', 'fingerprint', 'source',
+                'wall_seconds', 'queue_seconds', 'model_calls', 'retries', 'prompt_tokens', 'completion_tokens',
+                'cost_usd', 'completed_at')
+
+
+def file_digest(path):
+    """Return (sha256 hex digest, size in bytes) of a file, or (None, None) if it doesn't exist."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest(), os.path.getsize(path)
+    except OSError:
+        return None, None
+
+
+def created_iso(created):
+    """Convert a manifest's 'created' stamp (YYYYmmdd_HHMMSS) to ISO format for sorting and date filters."""
+    try:
+        return datetime.strptime(created, "%Y%m%d_%H%M%S").isoformat()
+    except (TypeError, ValueError):
+        return created or datetime.now().isoformat(timespec='seconds')
+
+
+class RunCatalog:
+    """Thread-safe handle on the catalog database; one instance can be shared by all workers."""
+
+    def __init__(self, path=DEFAULT_CATALOG):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            # WAL lets readers (the query CLI) run while a generator is writing
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SCHEMA)
+            try:
+                self._conn.executescript(FTS_SCHEMA)
+                self.full_text = True
+            except sqlite3.OperationalError:
+                # SQLite built without FTS5: text search falls back to scanning with LIKE
+                self.full_text = False
+
+    def close(self):
+        self._conn.close()
+
+    def _write(self, statements):
+        """Run (sql, params) statements in one transaction."""
+        with self._lock, self._conn:
+            for sql, params in statements:
+                self._conn.execute(sql, params)
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params).fetchall()]
+
+    def record_run(self, run_id, **fields):
+        """Insert a run or update the given fields of an existing one.
+
+        A new run needs at least movie_dir, created and status. A 'styles' field
+        (list of names) replaces the run's styles.
+        """
+        styles = fields.pop('styles', None)
+        if styles is not None:
+            fields['styles'] = ','.join(styles)
+        columns = [column for column in RUN_COLUMNS if column in fields]
+        values = [fields[column] for column in columns]
+        with self._lock, self._conn:
+            updated = self._conn.execute(
+                f"UPDATE runs SET {', '.join(f'{c} = ?' for c in columns)} WHERE run_id = ?", values + [run_id]
+            ).rowcount
+            if not updated:
+                self._conn.execute(
+                    f"INSERT INTO runs (run_id, {', '.join(columns)}) VALUES (?, {', '.join('?' * len(columns))})",
+                    [run_id] + values,
+                )
+            if styles is not None:
+                self._conn.execute("DELETE FROM run_styles WHERE run_id = ?", (run_id,))
+                self._conn.executemany("INSERT INTO run_styles (run_id, style) VALUES (?, ?)",
+                                       [(run_id, style) for style in styles])
+
+    def record_task(self, run_id, task, **fields):
+        """Insert or replace one task's record."""
+        columns = [column for column in TASK_COLUMNS[2:] if column in fields]
+        self._write([(
+            f"INSERT OR REPLACE INTO tasks (run_id, task, {', '.join(columns)}) "
+            f"VALUES (?, ?, {', '.join('?' * len(columns))})",
+            [run_id, task] + [fields[column] for column in columns],
+        )])
+
+    def find_runs(self, status=None, since=None, until=None, model=None, style=None, text=None, limit=None):
+        """Return runs matching all given filters, newest first.
+
+        since/until are ISO dates or timestamps; text matches words (or word
+        prefixes) in the title or brief.
+        """
+        conditions = []
+        params = []
+        if status:
+            conditions.append("runs.status = ?")
+            params.append(status)
+        if since:
+            conditions.append("runs.created >= ?")
+            params.append(since)
+        if until:
+            # Make a bare date include the whole day
+            conditions.append("runs.created <= ?")
+            params.append(until + 'T23:59:59' if len(until) == 10 else until)
+        if model:
+            conditions.append("runs.model = ?")
+            params.append(model)
+        if style:
+            conditions.append("runs.run_id IN (SELECT run_id FROM run_styles WHERE style = ? COLLATE NOCASE)")
+            params.append(style)
+        if text and self.full_text:
+            # Every word must match the start of a word in the title or brief
+            conditions.append("runs.rowid IN (SELECT rowid FROM runs_fts WHERE runs_fts MATCH ?)")
+            params.append(' '.join('"{}"*'.format(word.replace('"', '""')) for word in text.split()))
+        elif text:
+            conditions.append("(runs.title LIKE ? OR runs.brief LIKE ?)")
+            params += [f"%{text}%"] * 2
+        sql = "SELECT * FROM runs"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY runs.created DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._query(sql, params)
+
+    def get_run(self, key):
+        """Return a run with its tasks, looked up by run id or movie directory, or None."""
+        runs = self._query("SELECT * FROM runs WHERE run_id = ? OR movie_dir = ? OR movie_dir = ?",
+                           (key, key, os.path.normpath(key)))
+        if not runs:
+            return None
+        run = runs[0]
+        run['tasks'] = self._query("SELECT * FROM tasks WHERE run_id = ? ORDER BY completed_at", (run['run_id'],))
+        return run
+
+    def index_movie_dir(self, movie_dir):
+        """Record an existing movie directory from its manifest. Returns the run id, or None without a manifest."""
+        try:
+            with open(os.path.join(movie_dir, 'manifest.json'), encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        run_id = manifest.get('run_id') or hashlib.sha256(os.path.abspath(movie_dir).encode('utf-8')).hexdigest()[:32]
+        if self._query("SELECT 1 FROM runs WHERE run_id = ?", (run_id,)):
+            # Recorded while it ran, with timings the manifest doesn't have; just follow a moved directory
+            self.record_run(run_id, movie_dir=movie_dir)
+            return run_id
+        self.record_run(
+            run_id, movie_dir=movie_dir, created=created_iso(manifest.get('created')),
+            title=manifest.get('title'), brief=manifest.get('brief'), movie_id=manifest.get('movie_id'),
+            status=manifest.get('status', 'unknown'), styles=manifest.get('styles') or [],
+        )
+        for task, entry in manifest.get('tasks', {}).items():
+            sha256, size = file_digest(os.path.join(movie_dir, entry.get('file', '')))
+            self.record_task(run_id, task, status=entry.get('status', 'done'), file=entry.get('file'),
+                             sha256=sha256, bytes=size, fingerprint=entry.get('fingerprint'),
+                             completed_at=entry.get('completed_at'))
+        return run_id
+
+
+def print_runs(runs):
+    if not runs:
+        print("No runs found")
+        return
+    print(f"{'Created':<19}  {'Status':<9}  {'Title':<32}  {'Model':<14}  Directory")
+    for run in runs:
+        print(f"{run['created'][:19]:<19}  {run['status']:<9}  {(run['title'] or '-')[:32]:<32}  "
+              f"{(run['model'] or '-')[:14]:<14}  {run['movie_dir']}")
+
+
+def export_runs(catalog, runs, output_format, output):
+    """Write runs as JSON (with their tasks) or CSV (one row per run)."""
+    f = open(output, 'w', encoding="utf-8", newline='') if output else sys.stdout
+    try:
+        if output_format == 'csv':
+            writer = csv.DictWriter(f, fieldnames=RUN_COLUMNS)
+            writer.writeheader()
+            writer.writerows(runs)
+        else:
+            json.dump([catalog.get_run(run['run_id']) for run in runs], f, indent=2)
+            f.write("\n")
+    finally:
+        if output:
+            f.close()
+
+
+def add_filter_arguments(parser):
+    parser.add_argument('--status', help="Only runs with this status (running, complete, cancelled, failed)")
+    parser.add_argument('--since', help="Only runs created on or after this date (YYYY-MM-DD)")
+    parser.add_argument('--until', help="Only runs created on or before this date (YYYY-MM-DD)")
+    parser.add_argument('--model', help="Only runs generated with this model")
+    parser.add_argument('--style', help="Only runs that used this style preset")
+    parser.add_argument('--limit', type=int, help="Maximum number of runs")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Query the catalog of generated movies")
+    parser.add_argument('--db', default=DEFAULT_CATALOG, help=f"Catalog database (default: {DEFAULT_CATALOG})")
+    commands = parser.add_subparsers(dest='command', required=True)
+    add_filter_arguments(commands.add_parser('list', help="List runs, newest first"))
+    search_parser = commands.add_parser('search', help="Find runs whose title or brief contains TEXT")
+    search_parser.add_argument('text')
+    add_filter_arguments(search_parser)
+    show_parser = commands.add_parser('show', help="Show a run and its tasks")
+    show_parser.add_argument('run', help="Run id or movie directory")
+    export_parser = commands.add_parser('export', help="Export runs as JSON or CSV")
+    export_parser.add_argument('--format', choices=('json', 'csv'), default='json')
+    export_parser.add_argument('-o', '--output', help="Output file (default: stdout)")
+    add_filter_arguments(export_parser)
+    index_parser = commands.add_parser('index', help="Add existing movie directories to the catalog")
+    index_parser.add_argument('directory', nargs='?', default='files',
+                              help="Directory containing movie directories (default: files)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    catalog = RunCatalog(args.db)
+    filters = {name: getattr(args, name, None) for name in ('status', 'since', 'until', 'model', 'style', 'limit')}
+    if args.command == 'list':
+        print_runs(catalog.find_runs(**filters))
+    elif args.command == 'search':
+        print_runs(catalog.find_runs(text=args.text, **filters))
+    elif args.command == 'show':
+        run = catalog.get_run(args.run)
+        if run is None:
+            print(f"Error: no run '{args.run}' in {args.db}")
+            sys.exit(1)
+        print(json.dumps(run, indent=2))
+    elif args.command == 'export':
+        export_runs(catalog, catalog.find_runs(**filters), args.format, args.output)
+    elif args.command == 'index':
+        count = 0
+        with os.scandir(args.directory) as entries:
+            for entry in entries:
+                if entry.is_dir() and catalog.index_movie_dir(entry.path):
+                    count += 1
+        print(f"Indexed {count} movie directories into {args.db}")
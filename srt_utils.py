@@ -2,13 +2,65 @@
 Utility functions for working with SRT (SubRip) subtitle files.
 """
 
+import re
+from array import array
+
+import numpy as np
+
+TIMESTAMP_PATTERN = re.compile(r'^(\d{2,}):([0-5]\d):([0-5]\d)[,.](\d{3})$')
+# A whole timing line, matched at once on the hot path of the parser
+TIMING_LINE_PATTERN = re.compile(
+    r'(\d{2,}):([0-5]\d):([0-5]\d)[,.](\d{3}) --> (\d{2,}):([0-5]\d):([0-5]\d)[,.](\d{3})(?:\s|$)'
+)
+
+class SrtError(ValueError):
+    """Raised when SRT content cannot be parsed."""
+
+class SrtEntry:
+    """A single subtitle entry with its timing in integer milliseconds."""
+    __slots__ = ('index', 'start_ms', 'end_ms', 'text', 'line')
+
+    def __init__(self, index, start_ms, end_ms, text, line=None):
+        self.index = index
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.text = text
+        # Line number of the entry's index line, for error messages
+        self.line = line
+
+    def __repr__(self):
+        return f"SrtEntry({self.index}, {self.start_ms}, {self.end_ms}, {self.text!r})"
+
+class SubtitleTrack:
+    """
+    A whole subtitle track stored column-wise: int64 NumPy arrays of start and
+    end milliseconds plus an object array of texts, so bulk operations run
+    as array arithmetic instead of per-cue Python loops.
+    """
+    __slots__ = ('starts', 'ends', 'texts')
+
+    def __init__(self, starts, ends, texts):
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.ends = np.asarray(ends, dtype=np.int64)
+        self.texts = np.asarray(texts, dtype=object)
+        if not (len(self.starts) == len(self.ends) == len(self.texts)):
+            raise ValueError("starts, ends and texts must have the same length")
+
+    def __len__(self):
+        return len(self.starts)
+
+    @property
+    def duration_ms(self):
+        """End of the last cue, in milliseconds (0 for an empty track)"""
+        return int(self.ends.max()) if len(self) else 0
+
 def format_timestamp(seconds):
     """Convert seconds to SRT timestamp format (HH:MM:SS,mmm)"""
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    seconds = seconds % 60
-    milliseconds = int((seconds % 1) * 1000)
-    seconds = int(seconds)
+    # Work in whole milliseconds so e.g. 5.3 doesn't come out as 00:00:05,299
+    total_ms = int(round(seconds * 1000))
+    hours, total_ms = divmod(total_ms, 3600000)
+    minutes, total_ms = divmod(total_ms, 60000)
+    seconds, milliseconds = divmod(total_ms, 1000)
     return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
 
 def create_srt_entry(index, start_time, end_time, text):
@@ -17,50 +69,248 @@ def create_srt_entry(index, start_time, end_time, text):
     text = text.replace('```', '')
     return f"{index}\n{start_time} --> {end_time}\n{text}\n\n"
 
-def validate_srt(srt_content):
+def build_srt(texts, durations):
     """
-    Validate SRT content format
+    Build SRT content with one entry per text, placed back to back.
+    durations gives each entry's length in seconds (e.g. its scene's clip length).
+    """
+    texts = list(texts)
+    durations = list(durations)
+    if len(texts) != len(durations):
+        raise ValueError(f"Got {len(texts)} texts but {len(durations)} durations")
+    entries = []
+    start_ms = 0
+    for index, (text, duration) in enumerate(zip(texts, durations), 1):
+        # Accumulate in whole milliseconds so long tracks don't drift
+        end_ms = start_ms + int(round(duration * 1000))
+        entries.append(create_srt_entry(index, format_timestamp(start_ms / 1000),
+                                        format_timestamp(end_ms / 1000), text))
+        start_ms = end_ms
+    return ''.join(entries)
+
+def parse_timestamp(timestamp):
+    """Convert an SRT timestamp (HH:MM:SS,mmm) to integer milliseconds"""
+    match = TIMESTAMP_PATTERN.match(timestamp.strip())
+    if not match:
+        raise SrtError(f"Invalid timestamp '{timestamp.strip()}'")
+    hours, minutes, seconds, milliseconds = (int(part) for part in match.groups())
+    return ((hours * 60 + minutes) * 60 + seconds) * 1000 + milliseconds
+
+def iter_srt(lines):
+    """
+    Parse SRT lines into SrtEntry objects, one entry at a time.
+    Accepts any iterable of lines (an open file, a list, a generator), so
+    arbitrarily long subtitle files are parsed in bounded memory.
+    Raises SrtError with the offending line number on malformed input.
+    """
+    state = 'index'
+    index = start_ms = end_ms = entry_line = None
+    text_lines = []
+    line_number = 0
+    for line_number, line in enumerate(lines, 1):
+        line = line.rstrip('\r\n')
+        if line_number == 1:
+            line = line.lstrip('\ufeff')
+
+        if state == 'index':
+            # Skip empty lines between entries
+            if not line.strip():
+                continue
+            if not line.strip().isdigit():
+                raise SrtError(f"Invalid entry index at line {line_number}")
+            index = int(line)
+            entry_line = line_number
+            state = 'timing'
+        elif state == 'timing':
+            match = TIMING_LINE_PATTERN.match(line)
+            if match:
+                h1, m1, s1, ms1, h2, m2, s2, ms2 = map(int, match.groups())
+                start_ms = ((h1 * 60 + m1) * 60 + s1) * 1000 + ms1
+                end_ms = ((h2 * 60 + m2) * 60 + s2) * 1000 + ms2
+                text_lines = []
+                state = 'text'
+                continue
+            # Slow path: work out what exactly is wrong with the line
+            timestamp_parts = line.split(' --> ')
+            if len(timestamp_parts) != 2 or not timestamp_parts[1].split():
+                raise SrtError(f"Invalid timestamp format at line {line_number}")
+            try:
+                start_ms = parse_timestamp(timestamp_parts[0])
+                # Anything after the end timestamp is positioning info
+                end_ms = parse_timestamp(timestamp_parts[1].split()[0])
+            except SrtError as e:
+                raise SrtError(f"{e} at line {line_number}") from None
+            text_lines = []
+            state = 'text'
+        elif line.strip():
+            text_lines.append(line)
+        elif not text_lines:
+            raise SrtError(f"Missing subtitle text at line {line_number}")
+        else:
+            yield SrtEntry(index, start_ms, end_ms, '\n'.join(text_lines), entry_line)
+            state = 'index'
+
+    if state == 'timing':
+        raise SrtError("Unexpected end of file after index")
+    if state == 'text':
+        if not text_lines:
+            raise SrtError("Unexpected end of file after timestamp")
+        yield SrtEntry(index, start_ms, end_ms, '\n'.join(text_lines), entry_line)
+
+def validate_srt_lines(lines, max_duration=None):
+    """
+    Validate SRT lines in a single streaming pass: numbering, timestamp
+    format, end after start, monotonic start times, no overlapping entries
+    and, if max_duration (seconds) is given, no entry longer than that.
     Returns tuple (is_valid, error_message)
     """
-    lines = srt_content.strip().split('\n')
-    if not lines:
-        return False, "Empty SRT content"
-    
+    max_duration_ms = None if max_duration is None else round(max_duration * 1000)
+    entry_count = 0
+    previous = None
     try:
-        entry_count = 1
-        i = 0
-        while i < len(lines):
-            # Skip empty lines
-            while i < len(lines) and not lines[i].strip():
-                i += 1
-            if i >= len(lines):
-                break
-                
-            # Check index
-            if not lines[i].strip().isdigit() or int(lines[i]) != entry_count:
-                return False, f"Invalid entry index at line {i+1}"
-            i += 1
-            
-            # Check timestamp format
-            if i >= len(lines):
-                return False, "Unexpected end of file after index"
-            timestamp_parts = lines[i].split(' --> ')
-            if len(timestamp_parts) != 2:
-                return False, f"Invalid timestamp format at line {i+1}"
-            i += 1
-            
-            # Check subtitle text
-            if i >= len(lines):
-                return False, "Unexpected end of file after timestamp"
-            while i < len(lines) and lines[i].strip():
-                i += 1
-            
+        for entry in iter_srt(lines):
             entry_count += 1
-            
-        return True, "Valid SRT format"
+            if entry.index != entry_count:
+                return False, f"Invalid entry index at line {entry.line}"
+            if entry.end_ms <= entry.start_ms:
+                return False, f"Entry {entry.index} ends before it starts at line {entry.line + 1}"
+            if previous is not None:
+                if entry.start_ms < previous.start_ms:
+                    return False, f"Entry {entry.index} starts before entry {previous.index} at line {entry.line + 1}"
+                if entry.start_ms < previous.end_ms:
+                    return False, f"Entry {entry.index} overlaps entry {previous.index} at line {entry.line + 1}"
+            if max_duration_ms is not None and entry.end_ms - entry.start_ms > max_duration_ms:
+                return False, (f"Entry {entry.index} lasts {(entry.end_ms - entry.start_ms) / 1000:g} seconds, "
+                               f"more than {max_duration:g} at line {entry.line + 1}")
+            previous = entry
+    except SrtError as e:
+        return False, str(e)
     except Exception as e:
         return False, f"Error validating SRT: {str(e)}"
 
+    if entry_count == 0:
+        return False, "Empty SRT content"
+    return True, "Valid SRT format"
+
+def validate_srt(srt_content, max_duration=None):
+    """
+    Validate SRT content format and timing
+    Returns tuple (is_valid, error_message)
+    """
+    return validate_srt_lines(srt_content.splitlines(), max_duration=max_duration)
+
+def validate_srt_file(filepath, max_duration=None):
+    """
+    Validate an SRT file without loading it into memory
+    Returns tuple (is_valid, error_message)
+    """
+    with open(filepath, encoding="utf-8") as f:
+        return validate_srt_lines(f, max_duration=max_duration)
+
+def load_track(lines):
+    """
+    Parse SRT lines (any iterable, e.g. an open file) into a SubtitleTrack.
+    Timings are collected in compact typed arrays while streaming.
+    """
+    starts = array('q')
+    ends = array('q')
+    texts = []
+    for entry in iter_srt(lines):
+        starts.append(entry.start_ms)
+        ends.append(entry.end_ms)
+        texts.append(entry.text)
+    texts_array = np.empty(len(texts), dtype=object)
+    texts_array[:] = texts
+    return SubtitleTrack(np.frombuffer(starts, dtype=np.int64), np.frombuffer(ends, dtype=np.int64), texts_array)
+
+def shift_track(track, offset_ms):
+    """Return a copy of the track with every cue moved by offset_ms (may be negative)"""
+    return SubtitleTrack(track.starts + offset_ms, track.ends + offset_ms, track.texts.copy())
+
+def scale_track(track, new_duration_ms):
+    """Return a copy of the track with all timings rescaled so it ends at new_duration_ms"""
+    if track.duration_ms <= 0:
+        raise ValueError("Cannot rescale a track with no duration")
+    factor = new_duration_ms / track.duration_ms
+    starts = np.rint(track.starts * factor).astype(np.int64)
+    ends = np.rint(track.ends * factor).astype(np.int64)
+    return SubtitleTrack(starts, ends, track.texts.copy())
+
+def merge_tracks(*tracks):
+    """Merge tracks into one, ordered by start time (ties keep the order of the tracks)"""
+    starts = np.concatenate([track.starts for track in tracks])
+    ends = np.concatenate([track.ends for track in tracks])
+    texts = np.concatenate([track.texts for track in tracks])
+    order = np.argsort(starts, kind='stable')
+    return SubtitleTrack(starts[order], ends[order], texts[order])
+
+def concatenate_tracks(tracks, offsets_ms=None):
+    """
+    Concatenate tracks back to back, e.g. the subtitles of consecutive scene clips.
+    offsets_ms gives the start of each segment in the output; by default each
+    track starts where the previous one ends.
+    """
+    if not tracks:
+        return SubtitleTrack([], [], [])
+    if offsets_ms is None:
+        durations = np.array([track.duration_ms for track in tracks], dtype=np.int64)
+        offsets_ms = np.concatenate(([0], np.cumsum(durations)[:-1]))
+    offsets_ms = np.asarray(offsets_ms, dtype=np.int64)
+    if len(offsets_ms) != len(tracks):
+        raise ValueError("Expected one offset per track")
+    # Repeat each segment's offset once per cue in that segment
+    cue_offsets = np.repeat(offsets_ms, [len(track) for track in tracks])
+    starts = np.concatenate([track.starts for track in tracks]) + cue_offsets
+    ends = np.concatenate([track.ends for track in tracks]) + cue_offsets
+    texts = np.concatenate([track.texts for track in tracks])
+    return SubtitleTrack(starts, ends, texts)
+
+def format_timestamps(milliseconds):
+    """
+    Convert an array of millisecond timings to SRT timestamps (HH:MM:SS,mmm) at once.
+    Digits are computed with array arithmetic and written into a fixed-width
+    byte buffer, so there is no per-timestamp Python work. Hours are padded to
+    two digits each, like format_timestamp.
+    """
+    ms = np.asarray(milliseconds, dtype=np.int64)
+    if len(ms) and ms.min() < 0:
+        raise ValueError("Timestamps cannot be negative")
+    hours, rest = np.divmod(ms, 3600000)
+    minutes, rest = np.divmod(rest, 60000)
+    seconds, millis = np.divmod(rest, 1000)
+
+    width = 12
+    buffer = np.empty((len(ms), width), dtype=np.uint8)
+
+    def write_digits(values, column, count):
+        for i in range(count):
+            buffer[:, column + count - 1 - i] = ord('0') + (values // 10 ** i) % 10
+
+    write_digits(hours, 0, 2)
+    buffer[:, 2] = ord(':')
+    write_digits(minutes, 3, 2)
+    buffer[:, 5] = ord(':')
+    write_digits(seconds, 6, 2)
+    buffer[:, 8] = ord(',')
+    write_digits(millis, 9, 3)
+    formatted = buffer.view(f'S{width}').ravel().astype(str)
+    if len(ms) and hours.max() >= 100:
+        # Rare: 100+ hours don't fit the fixed width; redo just the hours of those entries
+        long = hours >= 100
+        formatted = formatted.astype(object)
+        formatted[long] = [f"{h}{rest[2:]}" for h, rest in zip(hours[long], formatted[long])]
+        formatted = formatted.astype(str)
+    return formatted
+
+def track_to_srt(track):
+    """Render a SubtitleTrack as SRT content, numbering entries from 1"""
+    starts = format_timestamps(track.starts)
+    ends = format_timestamps(track.ends)
+    return ''.join(
+        create_srt_entry(index, start, end, text)
+        for index, (start, end, text) in enumerate(zip(starts, ends, track.texts), 1)
+    )
+
 def save_srt_file(directory, srt_content):
     """
     Save SRT content to a file after validation
@@ -0,0 +1,74 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from srt_utils import SrtError, iter_srt, validate_srt, validate_srt_file
+
+
+def srt(*entries):
+    """Build SRT content from (start, end, text) tuples."""
+    return "".join(f"{i}\n{start} --> {end}\n{text}\n\n" for i, (start, end, text) in enumerate(entries, 1))
+
+
+def test_valid_content():
+    content = srt(("00:00:00,000", "00:00:02,500", "Hello"), ("00:00:02,500", "00:00:05,000", "World"))
+    assert validate_srt(content) == (True, "Valid SRT format")
+    entries = list(iter_srt(content.splitlines(keepends=True)))
+    assert [(e.index, e.start_ms, e.end_ms, e.text) for e in entries] == [
+        (1, 0, 2500, "Hello"), (2, 2500, 5000, "World")]
+
+
+def test_overlapping_entries():
+    content = srt(("00:00:00,000", "00:00:03,000", "Hello"), ("00:00:02,000", "00:00:04,000", "World"))
+    is_valid, message = validate_srt(content)
+    assert not is_valid
+    assert "Entry 2 overlaps entry 1" in message
+
+
+def test_end_before_start():
+    is_valid, message = validate_srt(srt(("00:00:05,000", "00:00:04,000", "Hello")))
+    assert not is_valid
+    assert "Entry 1 ends before it starts" in message
+
+
+def test_zero_length_entry():
+    assert not validate_srt(srt(("00:00:01,000", "00:00:01,000", "Hello")))[0]
+
+
+def test_max_duration():
+    content = srt(("00:00:00,000", "00:00:06,000", "Hello"))
+    assert validate_srt(content)[0]
+    is_valid, message = validate_srt(content, max_duration=5)
+    assert not is_valid
+    assert "lasts 6 seconds, more than 5" in message
+    assert validate_srt(content, max_duration=6)[0]
+
+
+@pytest.mark.parametrize("content", [
+    "1\n00:00:00,000 --> 00:00:01,000\n\n2\n00:00:01,000 --> 00:00:02,000\nWorld\n",
+    "1\n00:00:00,000 --> 00:00:01,000\nHello\n\n2\n00:00:01,000 --> 00:00:02,000\n",
+])
+def test_empty_text_block(content):
+    is_valid, message = validate_srt(content)
+    assert not is_valid
+    assert "subtitle text" in message or "after timestamp" in message
+
+
+def test_empty_text_block_raises_from_parser():
+    with pytest.raises(SrtError, match="Missing subtitle text at line 3"):
+        list(iter_srt(["1\n", "00:00:00,000 --> 00:00:01,000\n", "\n"]))
+
+
+def test_byte_order_mark(tmp_path):
+    content = "\ufeff" + srt(("00:00:00,000", "00:00:01,000", "Hello"))
+    assert validate_srt(content)[0]
+    path = tmp_path / "narration.srt"
+    path.write_text(content, encoding="utf-8")
+    assert validate_srt_file(str(path))[0]
+
+
+def test_empty_content():
+    assert validate_srt("") == (False, "Empty SRT content")
@@ -0,0 +1,183 @@
+"""
+Per-task instrumentation for movie runs.
+
+Every task execution is recorded as one span (wall time, time spent queued
+behind other tasks, model calls, retries, prompt/completion tokens, estimated
+cost and whether the output came from the model, the response cache or a
+previous run). Spans are appended as JSON lines to trace.jsonl in the movie
+directory and can additionally be exported as OpenTelemetry spans to a file.
+"""
+
+import json
+import random
+import threading
+
+TRACE_FILENAME = 'trace.jsonl'
+
+# USD per million (prompt, completion) tokens, matched on the longest model name prefix
+MODEL_PRICES = {
+    'gpt-4o-mini': (0.15, 0.60),
+    'gpt-4o': (2.50, 10.00),
+    'gpt-4.1-nano': (0.10, 0.40),
+    'gpt-4.1-mini': (0.40, 1.60),
+    'gpt-4.1': (2.00, 8.00),
+    'gpt-4-turbo': (10.00, 30.00),
+    'gpt-4': (30.00, 60.00),
+    'gpt-3.5-turbo': (0.50, 1.50),
+}
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    """Estimate the USD cost of a model's token usage, or None for models without a known price."""
+    if not model:
+        return None
+    name = model.split('/')[-1].lower()
+    matches = [prefix for prefix in MODEL_PRICES if name.startswith(prefix)]
+    if not matches:
+        return None
+    prompt_price, completion_price = MODEL_PRICES[max(matches, key=len)]
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+class OtelFileExporter:
+    """Write spans as OpenTelemetry JSON, one span per line, to a file.
+
+    Requires the opentelemetry-sdk package. Spans are exported directly rather
+    than through a TracerProvider, so this works even with OTEL_SDK_DISABLED=true
+    (which only turns off crewai's own telemetry here). The file is opened on the
+    first export after construction or close(), so one exporter can be closed at
+    the end of each run and reused for the next.
+    """
+
+    def __init__(self, path, service_name='filmcrew'):
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+        self.path = path
+        self.resource = Resource.create({'service.name': service_name})
+        self._exporter_class = ConsoleSpanExporter
+        self._file = None
+        self._exporter = None
+        self._lock = threading.Lock()
+
+    def export(self, name, trace_id, attributes, start_time, end_time, span_id=None, parent_id=None,
+               error=None):
+        """Export one finished span; times are epoch seconds."""
+        from opentelemetry.sdk.trace import ReadableSpan
+        from opentelemetry.trace import SpanContext, TraceFlags
+        from opentelemetry.trace.status import Status, StatusCode
+
+        def context(span_id):
+            return SpanContext(trace_id, span_id, is_remote=False, trace_flags=TraceFlags(TraceFlags.SAMPLED))
+
+        span = ReadableSpan(
+            name,
+            context=context(span_id or random.getrandbits(64)),
+            parent=context(parent_id) if parent_id else None,
+            resource=self.resource,
+            # OpenTelemetry attributes can't be None
+            attributes={key: value for key, value in attributes.items() if value is not None},
+            status=Status(StatusCode.ERROR, error) if error else Status(StatusCode.OK),
+            start_time=int(start_time * 1e9),
+            end_time=int(end_time * 1e9),
+        )
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding="utf-8")
+                self._exporter = self._exporter_class(
+                    out=self._file, formatter=lambda span: span.to_json(indent=None) + "\n"
+                )
+            self._exporter.export([span])
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                self._exporter = None
+
+
+class RunTrace:
+    """Collects the task spans of one run and appends each to the run's trace file."""
+
+    def __init__(self, path, otel_exporter=None, run_id=None):
+        """run_id (32 hex digits, e.g. uuid4().hex) is stamped on every span and is also the
+        OpenTelemetry trace id, so spans join up with the manifest and run catalog; random if omitted."""
+        self.path = path
+        self.otel_exporter = otel_exporter
+        try:
+            self.trace_id = int(run_id, 16) if run_id and len(run_id) == 32 else None
+        except ValueError:
+            self.trace_id = None
+        if self.trace_id is None:
+            self.trace_id = random.getrandbits(128)
+        self.run_id = run_id or f"{self.trace_id:032x}"
+        # All task spans of the run are children of one root span in OpenTelemetry
+        self.root_span_id = random.getrandbits(64)
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def record(self, span):
+        """Append a finished task span (a dict with start_time and wall_seconds) to the trace."""
+        span = {'run_id': self.run_id, **span}
+        with self._lock:
+            self.spans.append(span)
+            with open(self.path, 'a', encoding="utf-8") as f:
+                f.write(json.dumps(span) + "\n")
+        if self.otel_exporter is not None:
+            attributes = {f"filmcrew.{key}": value for key, value in span.items()
+                          if key not in ('start_time', 'error') and not isinstance(value, (dict, list))}
+            self.otel_exporter.export(
+                f"task {span['task']}", self.trace_id, attributes, span['start_time'],
+                span['start_time'] + span['wall_seconds'], parent_id=self.root_span_id,
+                error=span.get('error'),
+            )
+
+    def finish(self, start_time, end_time, attributes=None, error=None):
+        """Export the root span covering the whole run (OpenTelemetry only); error marks a failed run."""
+        if self.otel_exporter is not None:
+            self.otel_exporter.export('movie run', self.trace_id, {'filmcrew.run_id': self.run_id, **(attributes or {})},
+                                      start_time, end_time, span_id=self.root_span_id, error=error)
+        return self.summarize()
+
+    def summarize(self):
+        """Aggregate the spans per agent role, in the order the agents first ran."""
+        rows = {}
+        for span in self.spans:
+            row = rows.setdefault(span['agent_role'], {
+                'agent_role': span['agent_role'], 'tasks': 0, 'wall_seconds': 0.0, 'queue_seconds': 0.0,
+                'model_calls': 0, 'retries': 0, 'prompt_tokens': 0, 'completion_tokens': 0,
+                'cost_usd': None, 'cache_hits': 0, 'errors': 0,
+            })
+            row['tasks'] += 1
+            for key in ('wall_seconds', 'queue_seconds', 'model_calls', 'retries', 'prompt_tokens',
+                        'completion_tokens'):
+                row[key] += span[key]
+            if span['cost_usd'] is not None:
+                row['cost_usd'] = (row['cost_usd'] or 0.0) + span['cost_usd']
+            row['cache_hits'] += span['source'] == 'cache'
+            row['errors'] += span['status'] != 'ok'
+        return list(rows.values())
+
+
+def format_summary(rows):
+    """Render summarize() rows as a table, slowest agent first, with a total line."""
+    rows = sorted(rows, key=lambda row: row['wall_seconds'], reverse=True)
+    total = {'agent_role': 'Total'}
+    for key in ('tasks', 'wall_seconds', 'queue_seconds', 'model_calls', 'retries', 'prompt_tokens',
+                'completion_tokens', 'cache_hits', 'errors'):
+        total[key] = sum(row[key] for row in rows)
+    costs = [row['cost_usd'] for row in rows if row['cost_usd'] is not None]
+    total['cost_usd'] = sum(costs) if costs else None
+
+    header = (f"{'Agent':<20} {'Tasks':>5} {'Wall s':>8} {'Queue s':>8} {'Calls':>5} {'Retries':>7} "
+              f"{'Prompt tok':>10} {'Compl tok':>9} {'Cost $':>8} {'Cached':>6}")
+    lines = [header, '-' * len(header)]
+    for row in rows + [total]:
+        cost = f"{row['cost_usd']:.4f}" if row['cost_usd'] is not None else '-'
+        lines.append(
+            f"{row['agent_role']:<20} {row['tasks']:>5} {row['wall_seconds']:>8.2f} {row['queue_seconds']:>8.2f} "
+            f"{row['model_calls']:>5} {row['retries']:>7} {row['prompt_tokens']:>10} "
+            f"{row['completion_tokens']:>9} {cost:>8} {row['cache_hits']:>6}"
+        )
+    return "\n".join(lines)
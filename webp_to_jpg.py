@@ -1,57 +1,123 @@
 from PIL import Image
-import sys
+from concurrent.futures import ProcessPoolExecutor
+import argparse
 import os
 
-def convert_webp_to_jpg(input_path):
-    """Convert a WebP image to JPG format."""
+def convert_webp_to_jpg(input_path, quality=75, optimize=False, progressive=False, max_size=None):
+    """Convert a WebP image to JPG format.
+
+    If max_size is given, the image is downscaled to fit within max_size x max_size
+    pixels, reducing by integer factors before the final resample.
+    """
     try:
         # Open the WebP image
         img = Image.open(input_path)
-        
+
         # Create output filename by replacing .webp with .jpg
         output_path = os.path.splitext(input_path)[0] + '.jpg'
-        
+
+        if max_size:
+            # Reduce by integer factors (Image.reduce) before the final resample, which is
+            # much cheaper than resampling from full size; WebP has no draft mode to decode smaller
+            img.thumbnail((max_size, max_size), reducing_gap=2.0)
+
         # Convert and save as JPG
-        img.convert('RGB').save(output_path, 'JPEG')
+        img.convert('RGB').save(output_path, 'JPEG', quality=quality, optimize=optimize,
+                                progressive=progressive)
         print(f"Successfully converted '{input_path}' to '{output_path}'")
         return True
     except Exception as e:
         print(f"Error converting {input_path}: {str(e)}")
         return False
 
-def process_directory(directory_path):
-    """Process all WebP files in the given directory."""
+def find_webp_files(directory_path, recursive=False):
+    """Yield paths of WebP files in a directory, descending into subdirectories if recursive."""
+    with os.scandir(directory_path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if recursive:
+                    yield from find_webp_files(entry.path, recursive)
+            elif entry.name.lower().endswith('.webp') and entry.is_file():
+                yield entry.path
+
+def is_up_to_date(input_path):
+    """Check whether the JPG for a WebP file exists and is newer than the source."""
+    output_path = os.path.splitext(input_path)[0] + '.jpg'
+    try:
+        return os.stat(output_path).st_mtime >= os.stat(input_path).st_mtime
+    except OSError:
+        return False
+
+def process_directory(directory_path, workers=None, recursive=False, force=False, **convert_options):
+    """Process all WebP files in the given directory.
+
+    Files are converted in a pool of `workers` processes (default: one per CPU;
+    1 converts in this process). Unless force is set, files whose JPG is newer
+    than the WebP source are skipped. Remaining keyword arguments are passed
+    to convert_webp_to_jpg.
+    """
     if not os.path.exists(directory_path):
         print(f"Error: Directory '{directory_path}' not found.")
         return
-    
+
     if not os.path.isdir(directory_path):
         print(f"Error: '{directory_path}' is not a directory.")
         return
-    
+
     # Count statistics
     total_files = 0
-    converted_files = 0
-    
+    skipped_files = 0
+    pending = []
+
     # Find all WebP files in the directory
-    for filename in os.listdir(directory_path):
-        if filename.lower().endswith('.webp'):
-            total_files += 1
-            input_path = os.path.join(directory_path, filename)
-            if convert_webp_to_jpg(input_path):
-                converted_files += 1
-    
+    for input_path in find_webp_files(directory_path, recursive):
+        total_files += 1
+        if not force and is_up_to_date(input_path):
+            skipped_files += 1
+        else:
+            pending.append(input_path)
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(pending) <= 1:
+        results = [convert_webp_to_jpg(path, **convert_options) for path in pending]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(convert_webp_to_jpg, path, **convert_options) for path in pending]
+            results = [future.result() for future in futures]
+    converted_files = sum(results)
+
     # Print summary
     if total_files == 0:
         print(f"No WebP files found in '{directory_path}'")
     else:
         print(f"\nConversion complete!")
         print(f"Total WebP files found: {total_files}")
+        print(f"Skipped (up to date): {skipped_files}")
         print(f"Successfully converted: {converted_files}")
-        print(f"Failed conversions: {total_files - converted_files}")
+        print(f"Failed conversions: {len(pending) - converted_files}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Convert WebP images in a directory to JPG")
+    parser.add_argument('directory_path', help="Directory containing WebP files")
+    parser.add_argument('-r', '--recursive', action='store_true', help="Also convert files in subdirectories")
+    parser.add_argument('-j', '--workers', type=int, help="Number of worker processes (default: one per CPU)")
+    parser.add_argument('-f', '--force', action='store_true', help="Reconvert files whose JPG is up to date")
+    parser.add_argument('-q', '--quality', type=int, default=75, help="JPEG quality, 1-95 (default: 75)")
+    parser.add_argument('--optimize', action='store_true', help="Optimize the JPEG Huffman tables")
+    parser.add_argument('--progressive', action='store_true', help="Write progressive JPEGs")
+    parser.add_argument('--max-size', type=int,
+                        help="Downscale images to fit within MAX_SIZE x MAX_SIZE pixels")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python webp_to_jpg.py <directory_path>")
-    else:
-        process_directory(sys.argv[1])
+    args = parse_args()
+    process_directory(
+        args.directory_path,
+        workers=args.workers,
+        recursive=args.recursive,
+        force=args.force,
+        quality=args.quality,
+        optimize=args.optimize,
+        progressive=args.progressive,
+        max_size=args.max_size,
+    )